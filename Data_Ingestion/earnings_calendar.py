@@ -0,0 +1,82 @@
+# ingestion/earnings_calendar.py
+"""Decide which symbols need a Finnhub earnings fetch for a run window.
+
+A symbol's earnings only change when it reports, so instead of pulling every symbol
+every night we keep a per-symbol calendar learned from the report_dates already in
+RAW.RAW_EARNINGS:
+
+    next period  = last period + median spacing of recent periods (~a quarter)
+    next report  = next period + REPORT_LAG_DAYS (results come out weeks after quarter end)
+
+A symbol is fetched when the run window touches [next report - WINDOW_BEFORE_DAYS,
+next report + WINDOW_AFTER_DAYS], when it has no history yet, every OVERDUE_EVERY_DAYS
+once a report is past that window and still missing, and on a slow staggered full
+refresh (each symbol once every REFRESH_DAYS, spread by crc32(symbol)).
+"""
+import datetime as dt
+import statistics
+import zlib
+
+QUARTER_DAYS = 91
+REPORT_LAG_DAYS = 35
+WINDOW_BEFORE_DAYS = 7
+WINDOW_AFTER_DAYS = 21
+OVERDUE_EVERY_DAYS = 7
+REFRESH_DAYS = 28
+
+
+def load_report_history(conn, end: dt.date) -> dict:
+    """{symbol -> sorted report_dates before `end`} from RAW.RAW_EARNINGS."""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT symbol, report_date FROM RAW.RAW_EARNINGS WHERE report_date < TO_DATE(%s) ORDER BY symbol, report_date",
+            (str(end),),
+        )
+        history = {}
+        for symbol, report_date in cur.fetchall():
+            history.setdefault(symbol, []).append(dt.date.fromisoformat(str(report_date)[:10]))
+        return history
+    finally:
+        cur.close()
+
+
+def expected_report(periods: list) -> dt.date:
+    """Date the report after the last known period should appear."""
+    spacing = QUARTER_DAYS
+    if len(periods) >= 3:
+        recent = periods[-5:]
+        gaps = [(b - a).days for a, b in zip(recent, recent[1:])]
+        # clamp so a missing quarter or a fiscal-year change can't derail the calendar
+        spacing = min(max(statistics.median(gaps), 80), 100)
+    return periods[-1] + dt.timedelta(days=spacing + REPORT_LAG_DAYS)
+
+
+def _slot_hit(symbol: str, every: int, start: dt.date, end: dt.date) -> bool:
+    """True when one of the days in [start, end) is this symbol's turn in an `every`-day cycle."""
+    slot = zlib.crc32(symbol.encode())
+    first, last = start.toordinal(), min(end.toordinal(), start.toordinal() + every)
+    return any((d + slot) % every == 0 for d in range(first, last))
+
+
+def plan_fetch(symbols, history: dict, start: dt.date, end: dt.date, refresh_days: int = REFRESH_DAYS) -> dict:
+    """{symbol -> reason} for the symbols to fetch in the window [start, end).
+
+    reason is one of "new", "window", "overdue", "refresh"; symbols not in the result are skipped.
+    """
+    plan = {}
+    for sym in symbols:
+        periods = history.get(sym)
+        if not periods:
+            plan[sym] = "new"
+            continue
+        due = expected_report(periods)
+        lo = due - dt.timedelta(days=WINDOW_BEFORE_DAYS)
+        hi = due + dt.timedelta(days=WINDOW_AFTER_DAYS)
+        if lo < end and start <= hi:
+            plan[sym] = "window"
+        elif end > hi and _slot_hit(sym, OVERDUE_EVERY_DAYS, max(start, hi + dt.timedelta(days=1)), end):
+            plan[sym] = "overdue"
+        elif _slot_hit(sym, refresh_days, start, end):
+            plan[sym] = "refresh"
+    return plan
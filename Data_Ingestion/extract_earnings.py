@@ -1,17 +1,27 @@
-import os, requests, json
+import os, argparse, requests, json, datetime as dt
 from dotenv import load_dotenv
 from db_utils import get_snowflake_connection
+from run_window import parse_window
+from earnings_calendar import load_report_history, plan_fetch
+from marketpulse.instrumentation import RunMetrics, timer, count, gauge, load_timer
 
 load_dotenv()
 API_KEY = os.getenv("FINNHUB_API_KEY")
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io/api/v1")  # benchmarks point this at a local fake
+SYMBOLS = ["AAPL","MSFT","GOOGL","AMZN"]
 
 def fetch_earnings(symbol: str):
-    url = "https://finnhub.io/api/v1/stock/earnings"
+    url = f"{FINNHUB_BASE_URL}/stock/earnings"
     resp = requests.get(url, params={"symbol": symbol, "token": API_KEY})
     resp.raise_for_status()
     return resp.json()   # list of dicts
 
-def load_to_snowflake(symbol: str, earnings: list[dict]):
+def load_to_snowflake(symbol: str, earnings: list[dict], end: dt.date):
+    """Upsert the symbol's quarters with period < end, keyed by (symbol, report_date).
+
+    Finnhub always returns the latest quarters, so the cut-off keeps a backfill run from
+    writing quarters that had not happened yet at its logical date.
+    """
     conn = get_snowflake_connection()
     cur = conn.cursor()
     try:
@@ -21,22 +31,64 @@ def load_to_snowflake(symbol: str, earnings: list[dict]):
         SELECT %s, TO_DATE(%s), %s, %s, %s, PARSE_JSON(%s)
         """
         inserted = 0
-        for e in earnings or []:
-            cur.execute(sql, (
-                symbol,
-                e.get("period"),          # "YYYY-MM-DD"
-                e.get("actual"),
-                e.get("estimate"),
-                e.get("surprisePercent"),
-                json.dumps(e),
-            ))
-            inserted += 1
-        conn.commit()
-        print(f"Inserted {inserted} earnings rows for {symbol}")
+        with load_timer(symbol, statements_per_row=2) as load:
+            for e in earnings or []:
+                period = e.get("period")          # "YYYY-MM-DD"
+                if not period or dt.date.fromisoformat(period) >= end:
+                    continue
+                cur.execute(
+                    "DELETE FROM RAW.RAW_EARNINGS WHERE symbol = %s AND report_date = TO_DATE(%s)",
+                    (symbol, period),
+                )
+                cur.execute(sql, (
+                    symbol,
+                    period,
+                    e.get("actual"),
+                    e.get("estimate"),
+                    e.get("surprisePercent"),
+                    json.dumps(e),
+                ))
+                inserted += 1
+            conn.commit()
+            load["rows"] = inserted
+        print(f"Upserted {inserted} earnings rows for {symbol}")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         cur.close(); conn.close()
 
+def run(start: dt.date, end: dt.date, symbols=SYMBOLS, full_refresh: bool = False):
+    """Fetch and upsert earnings for the symbols the calendar says may have reported.
+
+    full_refresh=True (or --full-refresh) fetches every symbol regardless.
+    """
+    with RunMetrics("ingest_earnings", connect=get_snowflake_connection):
+        if full_refresh:
+            plan = {sym: "forced" for sym in symbols}
+        else:
+            conn = get_snowflake_connection()
+            try:
+                with timer("warehouse_query", statement="earnings_calendar"):
+                    history = load_report_history(conn, end)
+            finally:
+                conn.close()
+            plan = plan_fetch(symbols, history, start, end)
+
+        for reason in set(plan.values()):
+            count("symbols_fetched", sum(r == reason for r in plan.values()), reason=reason)
+        count("symbols_skipped", len(symbols) - len(plan))
+        gauge("fetch_fraction", len(plan) / max(len(symbols), 1))
+        print(f"Fetching earnings for {len(plan)}/{len(symbols)} symbols: {plan}")
+
+        for sym in plan:
+            with timer("api_request", symbol=sym, provider="finnhub"):
+                data = fetch_earnings(sym)
+            load_to_snowflake(sym, data, end)
+
 if __name__ == "__main__":
-    for sym in ["AAPL","MSFT","GOOGL","AMZN"]:
-        data = fetch_earnings(sym)
-        load_to_snowflake(sym, data)
+    flags = argparse.ArgumentParser(add_help=False)
+    flags.add_argument("--full-refresh", action="store_true", help="fetch every symbol, ignoring the earnings calendar")
+    opts, rest = flags.parse_known_args()
+    start, end = parse_window("Load Finnhub earnings into RAW.RAW_EARNINGS", default_days=1, argv=rest)
+    run(start, end, full_refresh=opts.full_refresh)
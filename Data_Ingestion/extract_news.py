@@ -1,37 +1,80 @@
 import os, requests, json, datetime as dt
 from dotenv import load_dotenv
 from db_utils import get_snowflake_connection
+from run_window import parse_window, epoch
+from sentiment import SentimentCache, score_articles, article_key
+from marketpulse.instrumentation import RunMetrics, timer, load_timer
 
 load_dotenv()
 API_KEY = os.getenv("FINNHUB_API_KEY")
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io/api/v1")  # benchmarks point this at a local fake
+SYMBOLS = ["AAPL","MSFT","GOOGL","AMZN"]
 
-def fetch_news(symbol: str, days_back=30):
-    today = dt.date.today()
-    start = today - dt.timedelta(days=days_back)
-    url = "https://finnhub.io/api/v1/company-news"
-    resp = requests.get(url, params={"symbol": symbol, "from": str(start), "to": str(today), "token": API_KEY})
+def fetch_news(symbol: str, start: dt.date, end: dt.date):
+    # Finnhub's from/to are both inclusive; our window end is exclusive
+    url = f"{FINNHUB_BASE_URL}/company-news"
+    last = end - dt.timedelta(days=1)
+    resp = requests.get(url, params={"symbol": symbol, "from": str(start), "to": str(last), "token": API_KEY})
     resp.raise_for_status()
     return resp.json()
 
-def load_to_snowflake(symbol: str, articles: list[dict]):
+def load_to_snowflake(symbol: str, articles: list[dict], start: dt.date, end: dt.date, scores: dict = None):
+    """Replace the symbol's articles published in [start, end) in one transaction.
+
+    `scores` maps article_key -> sentiment (see sentiment.score_articles); articles
+    repeated within the batch are written once.
+    """
     conn = get_snowflake_connection()
     cur = conn.cursor()
     try:
+        lo, hi = epoch(start), epoch(end)
+        with timer("warehouse_query", symbol=symbol, statement="delete") as q:
+            cur.execute(
+                "DELETE FROM RAW.RAW_NEWS WHERE symbol = %s AND published_at >= TO_TIMESTAMP_NTZ(%s) AND published_at < TO_TIMESTAMP_NTZ(%s)",
+                (symbol, lo, hi),
+            )
+            q["query_id"] = cur.sfqid
         sql = """
         INSERT INTO RAW.RAW_NEWS
             (symbol, published_at, headline, sentiment, raw_payload)
         SELECT %s, TO_TIMESTAMP_NTZ(%s), %s, %s, PARSE_JSON(%s)
         """
-        inserted = 0
-        for a in articles or []:
-            cur.execute(sql, (symbol, a.get("datetime"), a.get("headline"), None, json.dumps(a)))
-            inserted += 1
-        conn.commit()
-        print(f"Inserted {inserted} news rows for {symbol}")
+        inserted, seen = 0, set()
+        scores = scores or {}
+        with load_timer(symbol) as load:
+            for a in articles or []:
+                key = article_key(a)
+                if key in seen or not lo <= (a.get("datetime") or 0) < hi:
+                    continue
+                seen.add(key)
+                cur.execute(sql, (symbol, a.get("datetime"), a.get("headline"), scores.get(key), json.dumps(a)))
+                inserted += 1
+            conn.commit()
+            load["rows"] = inserted
+        print(f"Replaced {inserted} news rows for {symbol} in [{start}, {end})")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         cur.close(); conn.close()
 
+def run(start: dt.date, end: dt.date, symbols=SYMBOLS):
+    with RunMetrics("ingest_news", connect=get_snowflake_connection):
+        batch = {}
+        for sym in symbols:
+            with timer("api_request", symbol=sym, provider="finnhub"):
+                batch[sym] = fetch_news(sym, start, end)
+
+        # one vectorized scoring pass over the whole batch; cached ids are skipped
+        cache = SentimentCache()
+        try:
+            scores = score_articles([a for arts in batch.values() for a in arts or []], cache)
+        finally:
+            cache.close()
+
+        for sym, arts in batch.items():
+            load_to_snowflake(sym, arts, start, end, scores)
+
 if __name__ == "__main__":
-    for sym in ["AAPL","MSFT","GOOGL","AMZN"]:
-        arts = fetch_news(sym, days_back=30)
-        load_to_snowflake(sym, arts)
+    start, end = parse_window("Load Finnhub company news into RAW.RAW_NEWS", default_days=30)
+    run(start, end)
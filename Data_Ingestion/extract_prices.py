@@ -1,10 +1,25 @@
-import yfinance as yf
 import json
+import datetime as dt
 from db_utils import get_snowflake_connection
+from run_window import parse_window, epoch
+from marketpulse.instrumentation import RunMetrics, timer, count, load_timer
 
-def fetch_prices_yahoo(symbol: str, period="1mo", interval="1d"):
+SYMBOLS = ["AAPL","MSFT","GOOGL","AMZN"]
+# each run reloads this much history before its window so vol_20d / ret_5d in dbt
+# never depend on whether an earlier backfill run has finished yet
+LOOKBACK_DAYS = 35
+
+def fetch_prices_yahoo(symbol: str, start: dt.date = None, end: dt.date = None, period="1mo", interval="1d"):
+    import yfinance as yf  # heavy (pandas, lxml, ...); keep module import cheap for in-process tasks
     tkr = yf.Ticker(symbol)
-    hist = tkr.history(period=period, interval=interval)
+    if start is not None:
+        hist = tkr.history(start=str(start), end=str(end), interval=interval)
+    else:
+        hist = tkr.history(period=period, interval=interval)
+    return history_to_payload(hist)
+
+def history_to_payload(hist) -> dict:
+    """Convert a yfinance history frame into the Finnhub-style candle payload we store."""
     hist.reset_index(inplace=True)
     t = [int(row["Date"].timestamp()) for _, row in hist.iterrows()]
     return {
@@ -17,26 +32,57 @@ def fetch_prices_yahoo(symbol: str, period="1mo", interval="1d"):
         "_provider": "yahoo"
     }
 
-def load_to_snowflake(symbol: str, data: dict):
+def load_to_snowflake(symbol: str, data: dict, start: dt.date, end: dt.date):
+    """Replace the symbol's candles in [start, end) with `data` in one transaction.
+
+    yfinance often answers a failed request with an empty frame instead of raising; a
+    payload without candles in the window leaves the stored rows untouched.
+    """
+    lo, hi = epoch(start), epoch(end)
+    candles = [row for row in zip(data["t"], data["o"], data["h"], data["l"], data["c"], data["v"])
+               if lo <= row[0] < hi]
+    if not candles:
+        count("empty_responses", 1, symbol=symbol)
+        print(f"No candles for {symbol} in [{start}, {end}); keeping the stored rows")
+        return
     conn = get_snowflake_connection()
     cur = conn.cursor()
     try:
+        with timer("warehouse_query", symbol=symbol, statement="delete") as q:
+            cur.execute(
+                "DELETE FROM RAW.RAW_PRICES WHERE symbol = %s AND ts >= %s AND ts < %s",
+                (symbol, lo, hi),
+            )
+            q["query_id"] = cur.sfqid
         sql = """
         INSERT INTO RAW.RAW_PRICES
           (symbol, ts, open, high, low, close, volume, raw_payload)
         SELECT %s, %s, %s, %s, %s, %s, %s, PARSE_JSON(%s)
         """
-        payload = json.dumps(data)
+        with timer("json_dump", symbol=symbol):
+            payload = json.dumps(data)
         inserted = 0
-        for ts, o, h, l, c, v in zip(data["t"], data["o"], data["h"], data["l"], data["c"], data["v"]):
-            cur.execute(sql, (symbol, ts, o, h, l, c, v, payload))
-            inserted += 1
-        conn.commit()
-        print(f"Inserted {inserted} rows for {symbol} (provider: yahoo)")
+        with load_timer(symbol) as load:
+            for ts, o, h, l, c, v in candles:
+                cur.execute(sql, (symbol, ts, o, h, l, c, v, payload))
+                inserted += 1
+            conn.commit()
+            load["rows"] = inserted
+        print(f"Replaced {inserted} rows for {symbol} in [{start}, {end}) (provider: yahoo)")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         cur.close(); conn.close()
 
+def run(start: dt.date, end: dt.date, symbols=SYMBOLS):
+    fetch_start = start - dt.timedelta(days=LOOKBACK_DAYS)
+    with RunMetrics("ingest_prices", connect=get_snowflake_connection):
+        for sym in symbols:
+            with timer("api_request", symbol=sym, provider="yahoo"):
+                candles = fetch_prices_yahoo(sym, start=fetch_start, end=end, interval="1d")
+            load_to_snowflake(sym, candles, fetch_start, end)
+
 if __name__ == "__main__":
-    for sym in ["AAPL","MSFT","GOOGL","AMZN"]:
-        candles = fetch_prices_yahoo(sym, period="1mo", interval="1d")
-        load_to_snowflake(sym, candles)
+    start, end = parse_window("Load daily Yahoo candles into RAW.RAW_PRICES", default_days=1)
+    run(start, end)
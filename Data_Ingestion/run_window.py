@@ -0,0 +1,33 @@
+# ingestion/run_window.py
+import argparse
+import datetime as dt
+
+from marketpulse import profiling
+
+
+def parse_window(description: str, default_days: int, argv=None):
+    """Return the [start, end) date window an extractor run owns.
+
+    Airflow passes the run's data interval as --start/--end (ISO dates, end exclusive)
+    so backfill runs for different dates never touch each other's rows. Manual runs
+    fall back to the trailing `default_days` up to and including today. --profile turns
+    on marketpulse.profiling for the run.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--start", type=dt.date.fromisoformat, help="first date of the window (inclusive)")
+    parser.add_argument("--end", type=dt.date.fromisoformat, help="last date of the window (exclusive)")
+    parser.add_argument("--profile", action="store_true", help="write cProfile/tracemalloc artifacts for the run")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable()
+
+    end = args.end or dt.date.today() + dt.timedelta(days=1)
+    start = args.start or end - dt.timedelta(days=default_days)
+    if start >= end:
+        parser.error(f"empty window: start {start} must be before end {end}")
+    return start, end
+
+
+def epoch(day: dt.date) -> int:
+    """Seconds since epoch for midnight UTC of `day` (RAW.RAW_PRICES.ts is epoch seconds)."""
+    return int(dt.datetime(day.year, day.month, day.day, tzinfo=dt.timezone.utc).timestamp())
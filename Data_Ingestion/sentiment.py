@@ -0,0 +1,131 @@
+# ingestion/sentiment.py
+"""Local, batched headline sentiment with a persistent per-article cache.
+
+Scoring is lexicon based and vectorized over the whole batch with pandas (tokenize ->
+explode -> map -> groupby), so there is no network call and no model to load. Scores
+are cached in sqlite keyed by (Finnhub article id, LEXICON_VERSION); re-fetched
+articles cost a dict lookup, so scoring work tracks new articles only.
+"""
+import os
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from marketpulse.instrumentation import timer, count
+
+# bump when LEXICON / scoring changes so cached scores are recomputed
+LEXICON_VERSION = "fin-lex-1"
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[1] / "data" / "sentiment_cache.sqlite"
+
+LEXICON = {
+    # positive
+    "beat": 2.0, "beats": 2.0, "surge": 2.5, "surges": 2.5, "soar": 2.5, "soars": 2.5, "jump": 1.5,
+    "jumps": 1.5, "rally": 2.0, "rallies": 2.0, "gain": 1.5, "gains": 1.5, "record": 1.5, "upgrade": 2.0,
+    "upgraded": 2.0, "upgrades": 2.0, "outperform": 2.0, "growth": 1.5, "grow": 1.0, "grows": 1.0,
+    "strong": 1.5, "stronger": 1.5, "profit": 1.5, "profitable": 1.5, "raise": 1.0, "raises": 1.0,
+    "raised": 1.0, "buy": 1.0, "bullish": 2.0, "optimistic": 1.5, "boost": 1.5, "boosts": 1.5,
+    "exceed": 1.5, "exceeds": 1.5, "exceeded": 1.5, "win": 1.5, "wins": 1.5, "approval": 1.5,
+    "approved": 1.5, "innovative": 1.0, "partnership": 1.0, "dividend": 0.5, "buyback": 1.0,
+    "rebound": 1.5, "rebounds": 1.5, "higher": 1.0, "top": 0.5, "tops": 1.0, "positive": 1.5,
+    # negative
+    "miss": -2.0, "misses": -2.0, "missed": -2.0, "fall": -1.5, "falls": -1.5, "fell": -1.5,
+    "drop": -1.5, "drops": -1.5, "plunge": -2.5, "plunges": -2.5, "slump": -2.0, "slumps": -2.0,
+    "tumble": -2.0, "tumbles": -2.0, "downgrade": -2.0, "downgraded": -2.0, "downgrades": -2.0,
+    "underperform": -2.0, "weak": -1.5, "weaker": -1.5, "loss": -1.5, "losses": -1.5, "cut": -1.0,
+    "cuts": -1.0, "lawsuit": -2.0, "sued": -2.0, "probe": -1.5, "investigation": -1.5, "fraud": -3.0,
+    "recall": -2.0, "recalls": -2.0, "layoffs": -1.5, "bearish": -2.0, "sell": -1.0, "warning": -1.5,
+    "warns": -1.5, "decline": -1.5, "declines": -1.5, "lower": -1.0, "risk": -0.5, "fine": -1.0,
+    "fined": -1.5, "delay": -1.0, "delays": -1.0, "negative": -1.5, "bankruptcy": -3.0, "halt": -1.5,
+}
+NEGATIONS = {"not", "no", "never", "without", "isn't", "doesn't", "didn't", "won't", "can't"}
+ALPHA = 15.0  # VADER-style normalisation: s / sqrt(s^2 + ALPHA) maps sums into (-1, 1)
+
+
+def score_texts(texts) -> np.ndarray:
+    """Sentiment in (-1, 1) for each text; 0.0 when no lexicon word occurs."""
+    # positional index: token positions below are used as bincount slots
+    texts = pd.Series(list(texts), dtype="object").fillna("")
+    if texts.empty:
+        return np.zeros(0)
+    tokens = texts.str.lower().str.findall(r"[a-z']+").explode().dropna()
+    if tokens.empty:
+        return np.zeros(len(texts))
+
+    weights = tokens.map(LEXICON).to_numpy(dtype=float)
+    # a negation word directly before a lexicon word flips it ("not strong")
+    negated = tokens.groupby(level=0).shift(1).isin(NEGATIONS).to_numpy()
+    weights = np.where(negated, -weights, weights)
+
+    hit = ~np.isnan(weights)
+    doc = tokens.index.to_numpy(dtype=np.int64)
+    sums = np.bincount(doc[hit], weights=weights[hit], minlength=len(texts))
+    return sums / np.sqrt(sums * sums + ALPHA)
+
+
+class SentimentCache:
+    """sqlite-backed {article id -> score} for the current LEXICON_VERSION.
+
+    Safe to share between concurrent backfill runs (sqlite serializes writers).
+    """
+
+    def __init__(self, path=None):
+        path = Path(path or os.getenv("MARKETPULSE_SENTIMENT_CACHE") or DEFAULT_CACHE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("""
+          create table if not exists article_sentiment (
+            article_id integer not null,
+            version text not null,
+            score real not null,
+            primary key (article_id, version)
+          )
+        """)
+
+    def get_many(self, ids) -> dict:
+        found = {}
+        ids = list(ids)
+        for i in range(0, len(ids), 500):  # stay under sqlite's bound-parameter limit
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(self.conn.execute(
+                f"select article_id, score from article_sentiment where version = ? and article_id in ({marks})",
+                [LEXICON_VERSION, *chunk],
+            ).fetchall())
+        return found
+
+    def put_many(self, scores: dict):
+        with self.conn:
+            self.conn.executemany(
+                "insert or replace into article_sentiment (article_id, version, score) values (?, ?, ?)",
+                [(k, LEXICON_VERSION, float(v)) for k, v in scores.items()],
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+def article_key(a: dict):
+    """Finnhub id, or ("noid", datetime, headline) for the rare article without one."""
+    return a["id"] if a.get("id") is not None else ("noid", a.get("datetime"), a.get("headline"))
+
+
+def score_articles(articles: list[dict], cache: SentimentCache) -> dict:
+    """{article_key -> score} for Finnhub articles, scoring only ids not yet in the cache.
+
+    Articles without an id can't be cached; they are scored every time.
+    """
+    scores = cache.get_many({a["id"] for a in articles if a.get("id") is not None})
+    # the same article can come back for several related symbols in one batch
+    todo = list({article_key(a): a for a in articles if article_key(a) not in scores}.values())
+
+    count("sentiment_cache_hits", len(scores))
+    count("sentiment_scored", len(todo))
+    if todo:
+        with timer("sentiment_score"):
+            fresh = score_texts([f"{a.get('headline') or ''} {a.get('summary') or ''}" for a in todo])
+        fresh = {article_key(a): float(s) for a, s in zip(todo, fresh)}
+        cache.put_many({a["id"]: fresh[a["id"]] for a in todo if a.get("id") is not None})
+        scores.update(fresh)
+    return scores
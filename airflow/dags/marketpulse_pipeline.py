@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from airflow import DAG
 from airflow.operators.bash import BashOperator
+from airflow.operators.python import PythonOperator
 from airflow.providers.snowflake.operators.snowflake import SnowflakeOperator
 from airflow.providers.common.sql.operators.sql import SQLExecuteQueryOperator
 
@@ -9,6 +10,44 @@ PROJECT_DIR = Path("/opt/project")
 EXTRACT_DIR = PROJECT_DIR / "Data_Ingestion"
 DBT_DIR     = PROJECT_DIR / "dbt" / "marketpulse_dbt"
 ML_DIR      = PROJECT_DIR / "ml"
+SCRIPTS_DIR = PROJECT_DIR / "airflow" / "scripts"
+
+# every task works on the run's data interval only (end exclusive), so runs for
+# different dates are independent and catchup can backfill them side by side
+MAX_ACTIVE_RUNS = 8
+WINDOW_START = "{{ data_interval_start | ds }}"
+WINDOW_END = "{{ data_interval_end | ds }}"
+# concurrent dbt invocations must not share target/ (manifest, run_results, logs)
+DBT_RUN_TARGET = "target/{{ ts_nodash }}"
+DBT_RUN_PATHS = f'--target-path "{DBT_RUN_TARGET}" --log-path "logs/{{{{ ts_nodash }}}}"'
+
+
+def _run_in_process(module_dir, module_name, env, **kwargs):
+    """Import `module_name` from `module_dir` and call its run(**kwargs) in the worker.
+
+    Avoids a fresh interpreter per task: the worker already has airflow and the
+    snowflake connector loaded, and the task modules import their heavy libraries
+    lazily. The start/end/as_of kwargs arrive as ISO strings and are converted to dates.
+    """
+    import datetime as dt
+    import importlib
+    import os
+    import sys
+    import time
+
+    started = time.perf_counter()
+    os.environ.update(env)
+    for path in (str(PROJECT_DIR), module_dir):  # PROJECT_DIR for the shared marketpulse package
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    module = importlib.import_module(module_name)
+    kwargs = {k: dt.date.fromisoformat(v) if k in ("start", "end", "as_of") else v for k, v in kwargs.items()}
+    print(f"{module_name}: startup (env + import) took {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    module.run(**kwargs)
+    print(f"{module_name}: run took {time.perf_counter() - started:.2f}s")
+
 
 default_args = {
     "owner": "marketpulse",
@@ -20,28 +59,12 @@ with DAG(
     dag_id="marketpulse_pipeline",
     start_date=datetime(2025, 9, 1),
     schedule="0 22 * * *",  # daily 22:00 UTC
-    catchup=False,
+    catchup=True,
+    max_active_runs=MAX_ACTIVE_RUNS,
     default_args=default_args,
     tags=["stocks", "snowflake", "dbt", "ml"],
 ) as dag:
 
-    drop_schemas = SQLExecuteQueryOperator(
-    task_id="drop_schemas",
-    conn_id="snowflake_default",
-    sql="""
-      USE ROLE {{ var.value.SNOWFLAKE_ROLE }};
-      USE WAREHOUSE {{ var.value.SNOWFLAKE_WAREHOUSE }};
-      USE DATABASE {{ var.value.SNOWFLAKE_DATABASE }};
-
-      DROP SCHEMA IF EXISTS RAW     CASCADE;
-      DROP SCHEMA IF EXISTS STAGING CASCADE;
-      DROP SCHEMA IF EXISTS MART    CASCADE;
-    """,
-    split_statements=True,
-    autocommit=True,
-)
-
-
     create_schemas = SQLExecuteQueryOperator(
     task_id="create_schemas",
     conn_id="snowflake_default",
@@ -84,6 +107,18 @@ with DAG(
         raw_payload VARIANT,
         load_ts TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
       );
+
+      -- written by marketpulse.instrumentation.RunMetrics from the ingest and ML tasks
+      CREATE TABLE IF NOT EXISTS MART.PIPELINE_RUN_METRICS (
+        run_id STRING,
+        stage STRING,
+        metric STRING,
+        kind STRING,
+        value FLOAT,
+        labels VARIANT,
+        recorded_at TIMESTAMP_NTZ,
+        inserted_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+      );
     """,
     split_statements=True,
     autocommit=True,
@@ -100,33 +135,50 @@ with DAG(
     "SNOWFLAKE_SCHEMA": "RAW",
     "FINNHUB_API_KEY": "{{ var.value.FINNHUB_API_KEY }}",
     "PYTHONPATH": "/opt/project",
+    "MARKETPULSE_RUN_ID": "{{ run_id }}",
+    "MARKETPULSE_METRICS_DIR": "/opt/project/airflow/logs/metrics",
+    # set the Airflow Variable MARKETPULSE_PROFILE=1 to profile every Python task (marketpulse.profiling)
+    "MARKETPULSE_PROFILE": "{{ var.value.get('MARKETPULSE_PROFILE', '') }}",
+    "MARKETPULSE_PROFILE_DIR": "/opt/project/airflow/logs/profiles",
+    # state the tasks keep between runs lives under airflow/logs too: the Airflow user owns it,
+    # while a fresh clone's data/ would be created by Docker as root (see airflow-init)
+    "MARKETPULSE_FEATURE_STORE": "/opt/project/airflow/logs/feature_store",
+    "MARKETPULSE_SENTIMENT_CACHE": "/opt/project/airflow/logs/sentiment_cache.sqlite",
     }
 
-    ingest_prices = BashOperator(
+    ingest_prices = PythonOperator(
         task_id="ingest_prices",
-        bash_command=f'cd "{EXTRACT_DIR}" && python -u extract_prices.py',
-        env=BASE_ENV,
+        python_callable=_run_in_process,
+        op_args=[str(EXTRACT_DIR), "extract_prices", BASE_ENV],
+        op_kwargs={"start": WINDOW_START, "end": WINDOW_END},
     )
-    ingest_news = BashOperator(
+    ingest_news = PythonOperator(
         task_id="ingest_news",
-        bash_command=f'cd "{EXTRACT_DIR}" && python -u extract_news.py',
-        env=BASE_ENV,
+        python_callable=_run_in_process,
+        op_args=[str(EXTRACT_DIR), "extract_news", BASE_ENV],
+        op_kwargs={"start": WINDOW_START, "end": WINDOW_END},
     )
-    ingest_earnings = BashOperator(
+    ingest_earnings = PythonOperator(
         task_id="ingest_earnings",
-        bash_command=f'cd "{EXTRACT_DIR}" && python -u extract_earnings.py',
-        env=BASE_ENV,
+        python_callable=_run_in_process,
+        op_args=[str(EXTRACT_DIR), "extract_earnings", BASE_ENV],
+        op_kwargs={"start": WINDOW_START, "end": WINDOW_END},
     )
 
-    dbt_env = {**BASE_ENV, "DBT_PROFILES_DIR": "/opt/project/dbt"}
+    dbt_env = {
+        **BASE_ENV,
+        "DBT_PROFILES_DIR": "/opt/project/dbt",
+        "MARKETPULSE_START_DATE": WINDOW_START,
+        "MARKETPULSE_END_DATE": WINDOW_END,
+    }
 
     dbt_run = BashOperator(
         task_id="dbt_run",
         bash_command=(
-            'cd "/opt/project/dbt/marketpulse_dbt" && '
-            # if you use packages.yml keep deps; otherwise you can drop this line
-            'python -m dbt.cli.main deps && '
-            'python -m dbt.cli.main run --select "staging+ marts+"'
+            # deps/parse only rerun when their inputs changed; see the script header
+            f'bash "{SCRIPTS_DIR}/dbt_prepare.sh" "{DBT_RUN_TARGET}" && '
+            f'cd "{DBT_DIR}" && '
+            f'python -m dbt.cli.main run --select "staging+ marts+" {DBT_RUN_PATHS}'
         ),
         env=dbt_env,
     )
@@ -135,7 +187,7 @@ with DAG(
         task_id="dbt_test",
         bash_command=(
             f'cd "{DBT_DIR}" && '
-            'python -m dbt.cli.main test --select "marts+"'
+            f'python -m dbt.cli.main test --select "marts+" {DBT_RUN_PATHS}'
         ),
         env=dbt_env,
     )
@@ -146,6 +198,7 @@ with DAG(
     sql=r"""
       CREATE TABLE IF NOT EXISTS MART.ML_MODEL_METRICS (
         trained_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+        as_of_date DATE,
         symbol STRING,
         auc FLOAT,
         accuracy FLOAT,
@@ -153,6 +206,9 @@ with DAG(
         model_version STRING
       );
 
+      -- tables created before runs were date-partitioned
+      ALTER TABLE MART.ML_MODEL_METRICS ADD COLUMN IF NOT EXISTS as_of_date DATE;
+
       CREATE TABLE IF NOT EXISTS MART.ML_PREDICTIONS_DAILY (
         date DATE,
         symbol STRING,
@@ -174,9 +230,10 @@ with DAG(
 
       CREATE OR REPLACE VIEW MART.VW_PREDICTIONS_WITH_QC AS
       WITH last_metrics AS (
-        SELECT symbol, MAX(trained_at) AS trained_at
+        -- backfills finish out of order, so "latest" means latest as_of_date, not latest trained_at
+        SELECT symbol, trained_at
         FROM MART.ML_MODEL_METRICS
-        GROUP BY symbol
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY as_of_date DESC NULLS LAST, trained_at DESC) = 1
       )
       SELECT
         p.date,
@@ -196,10 +253,26 @@ with DAG(
     autocommit=True,
 )
 
-    ml_train_and_predict = BashOperator(
+    # local memory-mapped copy of the marts for training and the dashboard (marketpulse.feature_store)
+    sync_features = PythonOperator(
+        task_id="sync_feature_store",
+        python_callable=_run_in_process,
+        op_args=[str(ML_DIR), "feature_sync", BASE_ENV],
+        op_kwargs={"start": WINDOW_START, "end": WINDOW_END, "what": "features"},
+    )
+
+    ml_train_and_predict = PythonOperator(
         task_id="ml_train_and_predict",
-        bash_command=f'cd "{ML_DIR}" && python train_and_infer.py',
-        env=BASE_ENV,
+        python_callable=_run_in_process,
+        op_args=[str(ML_DIR), "train_and_infer", BASE_ENV],
+        op_kwargs={"as_of": WINDOW_END},
+    )
+
+    sync_predictions = PythonOperator(
+        task_id="sync_prediction_store",
+        python_callable=_run_in_process,
+        op_args=[str(ML_DIR), "feature_sync", BASE_ENV],
+        op_kwargs={"start": WINDOW_START, "end": WINDOW_END, "what": "predictions"},
     )
 
     warm_streamlit = BashOperator(
@@ -212,6 +285,7 @@ with DAG(
     ),
 )
     
-    drop_schemas >> create_schemas >> create_raw_tables >> [ingest_prices, ingest_news, ingest_earnings] \
-    >> dbt_run >> dbt_test >> ensure_mart_ml_and_views >> ml_train_and_predict >> warm_streamlit
+    create_schemas >> create_raw_tables >> [ingest_prices, ingest_news, ingest_earnings] \
+    >> dbt_run >> dbt_test >> ensure_mart_ml_and_views >> sync_features >> ml_train_and_predict \
+    >> sync_predictions >> warm_streamlit
 
@@ -0,0 +1,49 @@
+#!/usr/bin/env bash
+# Prepares the dbt project for one DAG run without redoing work earlier runs already did:
+#   - `dbt deps` only when packages.yml / package-lock.yml changed
+#   - `dbt parse` only when models, macros or project config changed
+# then seeds the run's own target dir with the shared partial_parse.msgpack so the
+# following `dbt run --target-path <dir>` only re-parses what differs for this run.
+# Per-run target/<ts> and logs/<ts> dirs older than DBT_RUN_DIR_RETENTION_DAYS (default 7)
+# are removed on the way.
+#
+# usage: dbt_prepare.sh <run target path, relative to the dbt project>
+set -euo pipefail
+
+RUN_TARGET="$1"
+STARTED=$(date +%s.%N)
+cd "$(dirname "$0")/../../dbt/marketpulse_dbt"
+
+fingerprint() { cat "$@" | sha1sum | cut -d' ' -f1; }
+
+# backfills run several of these at once; only one may touch dbt_packages/ and target/
+exec 9> .dbt_prepare.lock
+flock 9
+
+deps_hash=$(fingerprint packages.yml package-lock.yml)
+if [ "$(cat dbt_packages/.deps_hash 2>/dev/null)" != "$deps_hash" ]; then
+  python -m dbt.cli.main deps
+  echo "$deps_hash" > dbt_packages/.deps_hash
+else
+  echo "dbt deps: packages unchanged, skipping"
+fi
+
+parse_hash=$(fingerprint dbt_project.yml packages.yml ../profiles.yml \
+  $(find models macros -type f | sort))
+if [ "$(cat target/.parse_hash 2>/dev/null)" != "$parse_hash" ] || [ ! -f target/partial_parse.msgpack ]; then
+  python -m dbt.cli.main parse
+  echo "$parse_hash" > target/.parse_hash
+else
+  echo "dbt parse: project unchanged, reusing target/partial_parse.msgpack"
+fi
+
+# run dirs are named by ts_nodash (e.g. 20250106T220000); age is by mtime, so a backfill's
+# old logical dates are never removed while their run is still going
+find target logs -mindepth 1 -maxdepth 1 -type d -name '[0-9]*T[0-9]*' \
+  -mtime +"${DBT_RUN_DIR_RETENTION_DAYS:-7}" ! -path "$RUN_TARGET" -exec rm -rf {} + 2>/dev/null || true
+
+mkdir -p "$RUN_TARGET"
+cp target/partial_parse.msgpack "$RUN_TARGET/"
+flock -u 9
+
+awk -v s="$STARTED" -v e="$(date +%s.%N)" 'BEGIN { printf "dbt prepare took %.2fs\n", e - s }'
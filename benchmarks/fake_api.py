@@ -0,0 +1,76 @@
+# benchmarks/fake_api.py
+"""Local stand-in for the Finnhub endpoints the extractors call, serving a synthetic market.
+
+    with FakeFinnhub(market) as api:
+        extract_news.FINNHUB_BASE_URL = api.base_url
+        ...
+
+Yahoo is not served over HTTP: yfinance hard-codes its hosts, so the benchmark feeds
+synthetic history frames straight into extract_prices.history_to_payload instead.
+"""
+import datetime as dt
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeFinnhub:
+    def __init__(self, market, latency_s: float = 0.0):
+        self.market = market
+        self.latency_s = latency_s
+        self.calls = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                q = {k: v[0] for k, v in parse_qs(url.query).items()}
+                api.calls += 1
+                if api.latency_s:
+                    time.sleep(api.latency_s)
+
+                if url.path == "/api/v1/company-news":
+                    lo = _epoch(dt.date.fromisoformat(q["from"]))
+                    hi = _epoch(dt.date.fromisoformat(q["to"]) + dt.timedelta(days=1))  # "to" is inclusive
+                    body = [a for a in api.market["news"].get(q.get("symbol"), []) if lo <= a["datetime"] < hi]
+                elif url.path == "/api/v1/stock/earnings":
+                    body = api.market["earnings"].get(q.get("symbol"), [])
+                else:
+                    self.send_error(404)
+                    return
+
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _epoch(day: dt.date) -> int:
+    return int(dt.datetime(day.year, day.month, day.day, tzinfo=dt.timezone.utc).timestamp())
@@ -0,0 +1,156 @@
+# benchmarks/local_warehouse.py
+"""sqlite stand-in for the Snowflake objects the pipeline reads and writes.
+
+Only as much Snowflake dialect as our own SQL uses is translated: %s / %(name)s
+params, RAW./MART. schemas (attached databases), PARSE_JSON / TO_DATE /
+TO_TIMESTAMP_NTZ / DATEADD, current_date() / current_timestamp(). Column names come
+back upper-case like Snowflake's. Good enough to time our Python around the
+warehouse; it says nothing about Snowflake's own query performance.
+"""
+import datetime as dt
+import itertools
+import re
+import sqlite3
+
+import pandas as pd
+
+sqlite3.register_adapter(dt.date, lambda d: d.isoformat())
+sqlite3.register_adapter(dt.datetime, lambda d: d.isoformat(sep=" "))
+sqlite3.register_adapter(pd.Timestamp, lambda d: d.isoformat(sep=" "))
+
+SCHEMA = """
+CREATE TABLE RAW.RAW_PRICES (symbol TEXT, ts INTEGER, open REAL, high REAL, low REAL, close REAL, volume REAL,
+                             raw_payload TEXT, load_ts TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE RAW.RAW_NEWS (symbol TEXT, published_at TEXT, headline TEXT, sentiment REAL,
+                           raw_payload TEXT, load_ts TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE RAW.RAW_EARNINGS (symbol TEXT, report_date TEXT, actual_eps REAL, consensus_eps REAL,
+                               surprise_pct REAL, raw_payload TEXT, load_ts TEXT DEFAULT CURRENT_TIMESTAMP);
+
+CREATE TABLE MART.FEATURES_DAILY (date TEXT, symbol TEXT, close REAL, ret_d1 REAL, ret_5d REAL, vol_20d REAL,
+                                  articles_1d REAL, articles_3d REAL, sentiment_1d REAL, sentiment_3d REAL,
+                                  surprise_pct REAL, label_up_next_day INTEGER);
+CREATE TABLE MART.ML_MODEL_METRICS (trained_at TEXT DEFAULT CURRENT_TIMESTAMP, as_of_date TEXT, symbol TEXT,
+                                    auc REAL, accuracy REAL, n_rows INTEGER, model_version TEXT);
+CREATE TABLE MART.ML_PREDICTIONS_DAILY (date TEXT, symbol TEXT, p_up REAL, pred_label INTEGER,
+                                        model_version TEXT, inserted_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE MART.PIPELINE_RUN_METRICS (run_id TEXT, stage TEXT, metric TEXT, kind TEXT, value REAL,
+                                        labels TEXT, recorded_at TEXT, inserted_at TEXT DEFAULT CURRENT_TIMESTAMP);
+
+CREATE VIEW MART.LATEST_PREDICTIONS AS
+WITH ranked AS (
+  SELECT *, ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC, inserted_at DESC) rn
+  FROM ML_PREDICTIONS_DAILY
+)
+SELECT date, symbol, p_up, pred_label, model_version FROM ranked WHERE rn = 1;
+
+CREATE VIEW MART.VW_PREDICTIONS_WITH_QC AS
+WITH last_metrics AS (
+  SELECT symbol, trained_at FROM (
+    SELECT symbol, trained_at,
+           ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY as_of_date DESC, trained_at DESC) rn
+    FROM ML_MODEL_METRICS
+  ) WHERE rn = 1
+)
+SELECT p.date, p.symbol, p.p_up, p.pred_label, m.auc, m.accuracy, m.n_rows, p.model_version
+FROM LATEST_PREDICTIONS p
+LEFT JOIN last_metrics lm ON lm.symbol = p.symbol
+LEFT JOIN ML_MODEL_METRICS m ON m.symbol = lm.symbol AND m.trained_at = lm.trained_at;
+"""
+
+_REWRITES = [
+    (re.compile(r"%\((\w+)\)s"), r":\1"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"current_date\(\)", re.I), "date('now')"),
+    (re.compile(r"current_timestamp\(\)", re.I), "datetime('now')"),
+]
+
+
+def _translate(sql: str) -> str:
+    for pattern, repl in _REWRITES:
+        sql = pattern.sub(repl, sql)
+    return sql
+
+
+def _dateadd(unit, n, value):
+    if value is None:
+        return None
+    if unit.lower() != "day":
+        raise ValueError(f"DATEADD unit {unit!r} not supported by the local warehouse")
+    if len(value) <= 10:
+        return (dt.date.fromisoformat(value) + dt.timedelta(days=n)).isoformat()
+    return (dt.datetime.fromisoformat(value) + dt.timedelta(days=n)).isoformat(sep=" ")
+
+
+def _to_timestamp(epoch):
+    if epoch is None:
+        return None
+    return dt.datetime.fromtimestamp(int(epoch), dt.timezone.utc).replace(tzinfo=None).isoformat(sep=" ")
+
+
+class LocalWarehouse:
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.execute("ATTACH ':memory:' AS RAW")
+        self.db.execute("ATTACH ':memory:' AS MART")
+        self.db.create_function("PARSE_JSON", 1, lambda s: s, deterministic=True)
+        self.db.create_function("TO_DATE", 1, lambda s: s and s[:10], deterministic=True)
+        self.db.create_function("TO_TIMESTAMP_NTZ", 1, _to_timestamp, deterministic=True)
+        self.db.create_function("TO_TIMESTAMP", 1, _to_timestamp, deterministic=True)
+        self.db.create_function("DATEADD", 3, _dateadd, deterministic=True)
+        self.db.executescript(SCHEMA)
+        self._qid = itertools.count(1)
+
+    def connect(self):
+        """Drop-in for get_snowflake_connection / snow_conn / db.get_conn."""
+        return _Connection(self)
+
+    def count(self, table: str) -> int:
+        return self.db.execute(f"select count(*) from {table}").fetchone()[0]
+
+
+class _Connection:
+    def __init__(self, wh):
+        self.wh = wh
+
+    def cursor(self):
+        return _Cursor(self.wh)
+
+    def commit(self):
+        self.wh.db.commit()
+
+    def rollback(self):
+        self.wh.db.rollback()
+
+    def close(self):
+        pass
+
+
+class _Cursor:
+    def __init__(self, wh):
+        self.wh = wh
+        self._cur = wh.db.cursor()
+        self.sfqid = None
+
+    @property
+    def description(self):
+        d = self._cur.description
+        return d and [(c[0].upper(),) + tuple(c[1:]) for c in d]
+
+    def execute(self, sql, params=None):
+        self._cur.execute(_translate(sql), params or ())
+        self.sfqid = f"local-{next(self.wh._qid)}"
+        return self
+
+    def executemany(self, sql, seq):
+        self._cur.executemany(_translate(sql), seq)
+        self.sfqid = f"local-{next(self.wh._qid)}"
+        return self
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def close(self):
+        self._cur.close()
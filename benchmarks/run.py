@@ -0,0 +1,257 @@
+# benchmarks/run.py
+"""Benchmark ingest -> features -> train -> serve on synthetic data, fully offline.
+
+    python -m benchmarks.run                                   # small + medium
+    python -m benchmarks.run --scales small,medium,large --repeat 3
+    python -m benchmarks.run --baseline benchmarks/results/<earlier>.json
+
+Each benchmark calls the real pipeline code; only the outside world is replaced:
+Finnhub by benchmarks.fake_api, yfinance by synthetic history frames, Snowflake by
+benchmarks.local_warehouse (sqlite). Results are written as JSON; with --baseline the
+run is compared against an earlier file and exits 1 on regressions past --tolerance.
+"""
+import argparse
+import contextlib
+import datetime as dt
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for sub in ("", "Data_Ingestion", "ml", "stock-app"):
+    sys.path.insert(0, str(ROOT / sub))
+
+from benchmarks.synthetic import make_market, yahoo_history, build_features  # noqa: E402
+from benchmarks.fake_api import FakeFinnhub  # noqa: E402
+from benchmarks.local_warehouse import LocalWarehouse  # noqa: E402
+
+SCALES = {
+    "small": (20, 250),      # symbols, business days
+    "medium": (100, 500),
+    "large": (500, 1000),
+}
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+def measure(fn, repeat=1, memory=False):
+    """Best-of-`repeat` wall time of fn(); with memory=True one extra traced run for peak MB.
+
+    The pipeline code prints progress per symbol; that output is swallowed here.
+    """
+    best, out = float("inf"), None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            out = fn()
+            best = min(best, time.perf_counter() - started)
+        result = {"seconds": round(best, 6)}
+        if memory:
+            tracemalloc.start()
+            fn()
+            result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+            tracemalloc.stop()
+    return result, out
+
+
+def with_rate(result, rows):
+    result["rows"] = int(rows)
+    result["rows_per_s"] = round(rows / result["seconds"], 1) if result["seconds"] else None
+    return result
+
+
+def bench_scale(n_symbols, n_days, repeat, scratch: Path):
+    import extract_prices, extract_news, extract_earnings, sentiment
+    import train_and_infer, inference, feature_sync
+    import db, loaders
+
+    market = make_market(n_symbols, n_days)
+    symbols, dates = market["symbols"], market["dates"]
+    start, end = dates[0], dates[-1] + dt.timedelta(days=1)
+    wh = LocalWarehouse()
+    scratch.mkdir(parents=True)
+    os.environ["MARKETPULSE_FEATURE_STORE"] = str(scratch / "feature_store")
+    for mod in (extract_prices, extract_news, extract_earnings):
+        mod.get_snowflake_connection = wh.connect
+    train_and_infer.snow_conn = db.get_conn = wh.connect
+    out = {}
+
+    # --- ingest ------------------------------------------------------------
+    histories = {s: yahoo_history(market, s) for s in symbols}
+    extract_prices.fetch_prices_yahoo = \
+        lambda sym, start=None, end=None, interval="1d": extract_prices.history_to_payload(histories[sym].copy())
+    res, _ = measure(lambda: [extract_prices.history_to_payload(h.copy()) for h in histories.values()], repeat)
+    out["prices_parse"] = with_rate(res, len(market["prices"]))
+    res, _ = measure(lambda: extract_prices.run(start, end, symbols), repeat)
+    out["ingest_prices"] = with_rate(res, wh.count("RAW.RAW_PRICES"))
+
+    texts = [f"{a['headline']} {a['summary']}" for arts in market["news"].values() for a in arts]
+    res, _ = measure(lambda: sentiment.score_texts(texts), repeat)
+    out["sentiment_score"] = with_rate(res, len(texts))
+
+    with FakeFinnhub(market) as api:
+        extract_news.FINNHUB_BASE_URL = extract_earnings.FINNHUB_BASE_URL = api.base_url
+        caches = itertools.count()
+
+        def ingest_news_cold():
+            # a fresh sentiment cache per repeat, or best-of-N would only time cache hits
+            os.environ["MARKETPULSE_SENTIMENT_CACHE"] = str(scratch / f"sentiment_cache_{next(caches)}.sqlite")
+            extract_news.run(start, end, symbols)
+
+        res, _ = measure(ingest_news_cold, repeat)
+        out["ingest_news"] = with_rate(res, wh.count("RAW.RAW_NEWS"))
+        # rerunning the window: every article is already in the last run's cache
+        res, _ = measure(lambda: extract_news.run(start, end, symbols), repeat)
+        out["ingest_news_warm"] = with_rate(res, wh.count("RAW.RAW_NEWS"))
+        res, _ = measure(lambda: extract_earnings.run(start, end, symbols, full_refresh=True), repeat)
+        out["ingest_earnings_full"] = with_rate(res, wh.count("RAW.RAW_EARNINGS"))
+        # nightly case: the calendar only fetches symbols near an expected report
+        calls = api.calls
+        res, _ = measure(lambda: extract_earnings.run(end - dt.timedelta(days=1), end, symbols), repeat)
+        out["ingest_earnings"] = with_rate(res, wh.count("RAW.RAW_EARNINGS"))
+        out["ingest_earnings"]["api_calls_per_run"] = (api.calls - calls) / repeat
+
+    # --- transform / train / predict ------------------------------------------
+    res, feats = measure(lambda: build_features(market), repeat)
+    out["feature_build"] = with_rate(res, len(feats))
+    cols = ["DATE", "SYMBOL", "CLOSE"] + [c.upper() for c in train_and_infer.FEATURES] + ["LABEL_UP_NEXT_DAY"]
+    conn = wh.connect()
+    cur = conn.cursor()
+    cur.executemany(
+        f"insert into MART.FEATURES_DAILY ({', '.join(cols)}) values ({', '.join(['%s'] * len(cols))})",
+        feats[cols].astype(object).where(feats[cols].notna(), None).itertuples(index=False, name=None),
+    )
+    conn.commit()
+    feats = feats[[c for c in cols if c != "CLOSE"]]
+
+    # training's feature read: warehouse, then the local store after a full sync
+    res, df = measure(lambda: train_and_infer.load_features(conn, as_of=end), repeat)
+    out["load_features_warehouse"] = with_rate(res, len(df))
+    res, _ = measure(lambda: feature_sync.sync(conn, "features"), repeat)
+    out["feature_store_sync"] = with_rate(res, len(feats))
+    res, df = measure(lambda: train_and_infer.load_features(conn, as_of=end), repeat)
+    out["load_features_store"] = with_rate(res, len(df))
+
+    res, (models, metrics) = measure(lambda: train_and_infer.train_per_symbol(feats, min_rows=12), repeat, memory=True)
+    out["train_per_symbol"] = with_rate(res, len(feats))
+    out["train_per_symbol"]["models"] = len(models)
+
+    res, _ = measure(lambda: train_and_infer.write_predictions(conn, feats, models), repeat)
+    out["write_predictions"] = with_rate(res, len(models))
+    with contextlib.redirect_stdout(io.StringIO()):
+        train_and_infer.write_metrics(conn, metrics, feats["DATE"].max())
+    stacked = inference.StackedModel.from_models(models, train_and_infer.FEATURES)
+    res, scored = measure(lambda: inference.score_history(feats, stacked), repeat)
+    out["score_history"] = with_rate(res, len(scored))
+    # the same backtest read straight from the store's mapped columns (synced above)
+    res, scored = measure(lambda: train_and_infer.backtest(conn, stacked, start, end), repeat)
+    out["backtest_store"] = with_rate(res, len(scored))
+
+    # --- serve ---------------------------------------------------------------
+    # a prediction for every (symbol, date) so history queries have realistic volume;
+    # the latest date already has write_predictions' rows, so it is not seeded again
+    history = feats[feats["DATE"] < feats["DATE"].max()]
+    cur = conn.cursor()
+    cur.executemany(
+        "insert into MART.ML_PREDICTIONS_DAILY (date, symbol, p_up, pred_label, model_version) select %s, %s, %s, %s, %s",
+        [(d, s, 0.5, 0, "v1") for s, d in zip(history["SYMBOL"], history["DATE"])],
+    )
+    conn.commit()
+    for name, fn in [
+        ("load_latest_predictions", loaders.load_latest_predictions),
+        ("load_history", lambda: loaders.load_history(symbols[0], days=365)),
+        ("load_metrics", lambda: loaders.load_metrics(symbols[0])),
+        ("load_pipeline_metrics", lambda: loaders.load_pipeline_metrics(days=30)),
+    ]:
+        res, df = measure(fn, repeat)
+        out[name] = with_rate(res, len(df))
+    with contextlib.redirect_stdout(io.StringIO()):
+        feature_sync.sync(conn, "predictions")
+    res, df = measure(lambda: loaders.load_history(symbols[0], days=365), repeat)
+    out["load_history_store"] = with_rate(res, len(df))
+    return out
+
+
+def compare(current, baseline, tolerance):
+    """Print seconds ratios vs baseline; return the (scale, bench) pairs that regressed."""
+    regressions = []
+    print(f"\n{'scale':<8} {'benchmark':<26} {'baseline s':>11} {'current s':>11} {'ratio':>7}")
+    for scale, cur in current["scales"].items():
+        base = baseline.get("scales", {}).get(scale)
+        if not base:
+            continue
+        for name, res in cur["benchmarks"].items():
+            b = base["benchmarks"].get(name)
+            if not b or not b.get("seconds"):
+                continue
+            ratio = res["seconds"] / b["seconds"]
+            flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+            print(f"{scale:<8} {name:<26} {b['seconds']:>11.4f} {res['seconds']:>11.4f} {ratio:>7.2f}{flag}")
+            if flag:
+                regressions.append((scale, name))
+    return regressions
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="small,medium", help=f"comma list of {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=1, help="best-of-N wall time per benchmark")
+    parser.add_argument("--out", type=Path, help="results JSON (default benchmarks/results/<utc ts>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    # the local warehouse is a plain DBAPI connection, as is Snowflake's; pandas warns about both
+    warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy")
+    results = {
+        "meta": {
+            "created_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "scales": {},
+    }
+    # keep RunMetrics' OpenMetrics files, the sentiment caches and the feature stores out of the repo
+    with tempfile.TemporaryDirectory(prefix="marketpulse-bench-") as scratch:
+        os.environ.setdefault("MARKETPULSE_METRICS_DIR", scratch)
+        for scale in args.scales.split(","):
+            n_symbols, n_days = SCALES[scale]
+            print(f"[bench] {scale}: {n_symbols} symbols x {n_days} days")
+            benchmarks = bench_scale(n_symbols, n_days, args.repeat, Path(scratch) / scale)
+            for name, res in benchmarks.items():
+                print(f"  {name:<26} {res['seconds']:>9.4f}s  rows={res['rows']:<9} "
+                      + (f"peak={res['peak_mb']}MB" if "peak_mb" in res else ""))
+            results["scales"][scale] = {"symbols": n_symbols, "days": n_days, "benchmarks": benchmarks}
+
+    out = args.out or RESULTS_DIR / (dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"[bench] results -> {out}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"[bench] {len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# benchmarks/synthetic.py
+"""Deterministic synthetic market: N symbols x M business days of OHLCV, news and earnings.
+
+Shapes match what the real providers return (yfinance history frames, Finnhub
+company-news / stock/earnings JSON) so the extractors can run on them unchanged.
+"""
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+from sentiment import score_texts
+
+WORDS_UP = ["beats", "surges", "record", "upgrade", "growth", "strong", "rally", "profit"]
+WORDS_DOWN = ["misses", "falls", "downgrade", "lawsuit", "weak", "slump", "recall", "loss"]
+WORDS_NEUTRAL = ["reports", "announces", "update", "market", "shares", "quarter", "outlook", "ceo"]
+
+
+def make_market(n_symbols: int, n_days: int, news_per_day: float = 3.0, seed: int = 0, end: dt.date = None):
+    """Return a dict with symbols, dates, prices (long frame), news and earnings per symbol.
+
+    Dates are the `n_days` business days ending at `end` (default today) so
+    "last N days" dashboard queries see data.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or dt.date.today()
+    dates = pd.bdate_range(end=end, periods=n_days).date
+    symbols = [f"S{i:04d}" for i in range(n_symbols)]
+
+    # geometric random walk per symbol
+    rets = rng.normal(0.0003, 0.018, size=(n_symbols, n_days))
+    close = 50 * np.exp(np.cumsum(rets, axis=1)) * rng.uniform(0.5, 4, size=(n_symbols, 1))
+    open_ = close * (1 + rng.normal(0, 0.004, size=close.shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, size=close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, size=close.shape))
+    volume = rng.integers(1e5, 5e7, size=close.shape).astype(float)
+
+    prices = pd.DataFrame({
+        "SYMBOL": np.repeat(symbols, n_days),
+        "DATE": np.tile(dates, n_symbols),
+        "OPEN": open_.ravel(), "HIGH": high.ravel(), "LOW": low.ravel(),
+        "CLOSE": close.ravel(), "VOLUME": volume.ravel(),
+    })
+
+    news = {}
+    next_id = 1
+    vocab = np.array(WORDS_UP + WORDS_DOWN + WORDS_NEUTRAL)
+    for sym in symbols:
+        per_day = rng.poisson(news_per_day, size=n_days)
+        total = int(per_day.sum())
+        day_idx = np.repeat(np.arange(n_days), per_day)
+        secs = rng.integers(0, 86400, size=total)
+        words = vocab[rng.integers(0, len(vocab), size=(total, 6))]
+        articles = []
+        for k in range(total):
+            d = dates[day_idx[k]]
+            ts = int(dt.datetime(d.year, d.month, d.day, tzinfo=dt.timezone.utc).timestamp()) + int(secs[k])
+            headline = f"{sym} " + " ".join(words[k])
+            articles.append({
+                "id": next_id, "category": "company", "datetime": ts,
+                "headline": headline, "summary": headline.lower() + " said analysts",
+                "related": sym, "source": "synthetic", "url": f"https://example.invalid/{next_id}",
+                "image": "",
+            })
+            next_id += 1
+        news[sym] = articles
+
+    earnings = {}
+    quarter_ends = _quarter_ends(dates[0], end)
+    for sym in symbols:
+        rows = []
+        for q in quarter_ends:
+            est = round(float(rng.uniform(0.2, 3.0)), 2)
+            act = round(est * float(1 + rng.normal(0.02, 0.08)), 2)
+            rows.append({
+                "symbol": sym, "period": q.isoformat(), "year": q.year, "quarter": (q.month - 1) // 3 + 1,
+                "actual": act, "estimate": est,
+                "surprise": round(act - est, 4), "surprisePercent": round((act - est) / est * 100, 4),
+            })
+        earnings[sym] = rows[::-1]  # Finnhub returns newest first
+
+    return {"symbols": symbols, "dates": dates, "prices": prices, "news": news, "earnings": earnings}
+
+
+def _quarter_ends(first: dt.date, last: dt.date):
+    out = []
+    for year in range(first.year, last.year + 1):
+        for month, day in ((3, 31), (6, 30), (9, 30), (12, 31)):
+            q = dt.date(year, month, day)
+            if first <= q <= last:
+                out.append(q)
+    return out
+
+
+def yahoo_history(market, symbol: str) -> pd.DataFrame:
+    """The frame yfinance's Ticker.history() would return for `symbol`."""
+    p = market["prices"]
+    p = p[p["SYMBOL"] == symbol]
+    idx = pd.DatetimeIndex(pd.to_datetime(p["DATE"])).tz_localize("America/New_York")
+    return pd.DataFrame({
+        "Open": p["OPEN"].to_numpy(), "High": p["HIGH"].to_numpy(), "Low": p["LOW"].to_numpy(),
+        "Close": p["CLOSE"].to_numpy(), "Volume": p["VOLUME"].to_numpy(),
+        "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=idx.rename("Date"))
+
+
+def build_features(market) -> pd.DataFrame:
+    """pandas mirror of the dbt marts up to features_daily (same columns, upper-case like Snowflake)."""
+    p = market["prices"].sort_values(["SYMBOL", "DATE"]).reset_index(drop=True)
+    g = p.groupby("SYMBOL", sort=False)["CLOSE"]
+    p["RET_D1"] = p["CLOSE"] / g.shift(1) - 1
+    p["RET_5D"] = p["CLOSE"] / g.shift(5) - 1
+    p["VOL_20D"] = (p["RET_D1"].abs().groupby(p["SYMBOL"], sort=False)
+                    .rolling(20, min_periods=1).mean().reset_index(level=0, drop=True))
+    nxt = g.shift(-1)
+    p["LABEL_UP_NEXT_DAY"] = (nxt > p["CLOSE"]).astype(int)
+
+    news = pd.DataFrame(
+        [(sym, a["datetime"], f"{a['headline']} {a['summary']}") for sym, arts in market["news"].items() for a in arts],
+        columns=["SYMBOL", "TS", "TEXT"],
+    )
+    news_cols = ["ARTICLES_1D", "ARTICLES_3D", "SENTIMENT_1D", "SENTIMENT_3D"]
+    if not news.empty:
+        news["DATE"] = pd.to_datetime(news["TS"], unit="s").dt.date
+        news["SENTIMENT"] = score_texts(news["TEXT"])
+        daily = (news.groupby(["SYMBOL", "DATE"])
+                 .agg(ARTICLES_1D=("TS", "size"), SENT_SUM=("SENTIMENT", "sum")).reset_index())
+        rolled = (daily.groupby("SYMBOL")[["ARTICLES_1D", "SENT_SUM"]]
+                  .rolling(3, min_periods=1).sum().reset_index(level=0, drop=True))
+        daily["ARTICLES_3D"] = rolled["ARTICLES_1D"]
+        daily["SENTIMENT_1D"] = daily["SENT_SUM"] / daily["ARTICLES_1D"]
+        daily["SENTIMENT_3D"] = rolled["SENT_SUM"] / rolled["ARTICLES_1D"]
+        p = p.merge(daily.drop(columns="SENT_SUM"), on=["SYMBOL", "DATE"], how="left")
+    p[news_cols] = p.reindex(columns=news_cols).fillna(0)
+
+    earn = pd.DataFrame(
+        [(sym, dt.date.fromisoformat(e["period"]), e["surprisePercent"])
+         for sym, rows in market["earnings"].items() for e in rows],
+        columns=["SYMBOL", "DATE", "SURPRISE_PCT"],
+    )
+    p = p.merge(earn, on=["SYMBOL", "DATE"], how="left")
+    return p
@@ -0,0 +1,18 @@
+{#
+  Restricts an incremental model to the run's data interval, passed by Airflow as
+  MARKETPULSE_START_DATE / MARKETPULSE_END_DATE (ISO dates, end exclusive). These are env
+  vars rather than --vars because changing --vars forces a full re-parse, while a changed
+  env var only re-parses the files that read it. lookback_days widens the window
+  backwards for rows whose values depend on later data (e.g. next-day labels).
+  Full refreshes and runs without the env vars rebuild everything.
+#}
+{% macro partition_filter(date_column, lookback_days=0) -%}
+  {%- set start_date = env_var('MARKETPULSE_START_DATE', '') -%}
+  {%- set end_date = env_var('MARKETPULSE_END_DATE', '') -%}
+  {%- if is_incremental() and start_date and end_date -%}
+    {{ date_column }} >= dateadd('day', -{{ lookback_days }}, '{{ start_date }}'::date)
+    and {{ date_column }} < '{{ end_date }}'::date
+  {%- else -%}
+    1 = 1
+  {%- endif -%}
+{%- endmacro %}
@@ -2,7 +2,9 @@ with n as (
   select
     symbol,
     cast(published_at as date) as dt,
-    count(*) as articles_1d
+    count(*) as articles_1d,
+    count(sentiment) as scored_1d,
+    sum(sentiment) as sentiment_sum_1d
   from {{ ref('stg_news') }}
   group by 1,2
 ),
@@ -13,7 +15,15 @@ roll as (
     sum(articles_1d) over (
       partition by symbol order by dt
       rows between 2 preceding and current row
-    ) as articles_3d
+    ) as articles_3d,
+    sentiment_sum_1d / nullif(scored_1d, 0) as sentiment_1d,
+    sum(sentiment_sum_1d) over (
+      partition by symbol order by dt
+      rows between 2 preceding and current row
+    ) / nullif(sum(scored_1d) over (
+      partition by symbol order by dt
+      rows between 2 preceding and current row
+    ), 0) as sentiment_3d
   from n
 )
 
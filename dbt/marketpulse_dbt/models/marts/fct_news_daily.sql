@@ -1,6 +1,16 @@
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['symbol', 'date'],
+    on_schema_change='append_new_columns'
+) }}
+
 select
   symbol,
   dt as date,
   coalesce(articles_1d, 0) as articles_1d,
-  coalesce(articles_3d, 0) as articles_3d
+  coalesce(articles_3d, 0) as articles_3d,
+  sentiment_1d,
+  sentiment_3d
 from {{ ref('int_news_daily') }}
+where {{ partition_filter('dt') }}
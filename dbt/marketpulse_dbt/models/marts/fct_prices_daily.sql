@@ -1,6 +1,13 @@
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['symbol', 'date']
+) }}
+
 select
   symbol,
   dt as date,
   open, high, low, close, volume,
   ret_d1, ret_5d, vol_20d
 from {{ ref('int_prices_enriched') }}
+where {{ partition_filter('dt') }}
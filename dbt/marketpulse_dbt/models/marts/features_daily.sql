@@ -1,3 +1,10 @@
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['symbol', 'date'],
+    on_schema_change='append_new_columns'
+) }}
+
 with prices as (
   select * from {{ ref('fct_prices_daily') }}
 ),
@@ -6,22 +13,44 @@ news as (
 ),
 earn as (
   select * from {{ ref('fct_earnings') }}
+),
+{% if is_incremental() %}
+-- Finnhub returns a quarter weeks after its date, long after that date left the
+-- lookback below, so also rewrite every row whose surprise differs from the mart's
+late_earnings as (
+  select e.symbol, e.date
+  from earn e
+  join {{ this }} f on f.symbol = e.symbol and f.date = e.date
+  where f.surprise_pct is distinct from e.surprise_pct
+),
+{% endif %}
+
+labeled as (
+  select
+    p.date,
+    p.symbol,
+    p.close,
+    p.ret_d1,
+    p.ret_5d,
+    p.vol_20d,
+    coalesce(n.articles_1d, 0)  as articles_1d,
+    coalesce(n.articles_3d, 0)  as articles_3d,
+    coalesce(n.sentiment_1d, 0) as sentiment_1d,
+    coalesce(n.sentiment_3d, 0) as sentiment_3d,
+    e.surprise_pct,
+    case
+      when lead(p.close) over (partition by p.symbol order by p.date) > p.close
+        then 1 else 0
+    end as label_up_next_day
+  from prices p
+  left join news n  on p.symbol = n.symbol and p.date = n.date
+  left join earn e  on p.symbol = e.symbol and p.date = e.date
 )
 
-select
-  p.date,
-  p.symbol,
-  p.close,
-  p.ret_d1,
-  p.ret_5d,
-  p.vol_20d,
-  coalesce(n.articles_1d, 0)  as articles_1d,
-  coalesce(n.articles_3d, 0)  as articles_3d,
-  e.surprise_pct,
-  case
-    when lead(p.close) over (partition by p.symbol order by p.date) > p.close
-      then 1 else 0
-  end as label_up_next_day
-from prices p
-left join news n  on p.symbol = n.symbol and p.date = n.date
-left join earn e  on p.symbol = e.symbol and p.date = e.date
+-- the week before the window is rewritten too, so the previous session's
+-- label_up_next_day picks up the close that only arrived with this run
+select * from labeled
+where ({{ partition_filter('date', lookback_days=7) }})
+{%- if is_incremental() %}
+   or (symbol, date) in (select symbol, date from late_earnings)
+{%- endif %}
@@ -7,3 +7,8 @@ select
     headline,
     sentiment
 from src
+-- one row per article, in case overlapping loads left duplicates behind
+qualify row_number() over (
+    partition by symbol, coalesce(raw_payload:id::string, headline || published_at::string)
+    order by load_ts desc
+) = 1
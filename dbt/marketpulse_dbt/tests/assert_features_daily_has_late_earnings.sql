@@ -0,0 +1,10 @@
+-- every reported surprise must reach features_daily, including quarters that were
+-- loaded after their date had left the incremental model's lookback window
+select
+  e.symbol,
+  e.date,
+  e.surprise_pct,
+  f.surprise_pct as features_surprise_pct
+from {{ ref('fct_earnings') }} e
+join {{ ref('features_daily') }} f on f.symbol = e.symbol and f.date = e.date
+where f.surprise_pct is distinct from e.surprise_pct
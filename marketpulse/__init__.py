@@ -0,0 +1 @@
+# Shared helpers used by Data_Ingestion, ml and stock-app (import with the repo root on PYTHONPATH).
@@ -0,0 +1,317 @@
+# marketpulse/feature_store.py
+"""Local columnar copy of (SYMBOL, DATE)-keyed mart tables, read through memory maps.
+
+A store is a directory of immutable segments plus a meta.json naming the live ones:
+
+    <root>/<name>/meta.json                  {"segments": [...], "columns": [...], "since", "through"}
+    <root>/<name>/seg-<ts>-<id>/index.json   symbols, row offsets per symbol, replaced window
+    <root>/<name>/seg-<ts>-<id>/DATE.npy     datetime64[D], sorted within each symbol
+    <root>/<name>/seg-<ts>-<id>/<COL>.npy    float64, one file per column
+
+Rows in a segment are sorted by (symbol, date), so a symbol is an [offset, offset+n)
+slice and a date range inside it is a searchsorted away; with one segment a read is a
+view into the mapped file, no copy. Each sync appends a segment that replaces a date
+window (the same delete+insert a dbt incremental run does): rows of older segments
+inside a newer segment's window are hidden on read. Once there are more than
+MAX_SEGMENTS segments, or the appended segments outgrow a quarter of the base, they
+are compacted into a new base. meta.json is swapped atomically, so readers always see
+a complete set of segments; writers serialize on a lock file.
+
+`since` / `through` record the dates the store is known to be complete for; readers
+use covers() to decide between the store and the warehouse.
+"""
+import datetime as dt
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROOT = Path(__file__).resolve().parents[1] / "data" / "feature_store"
+MAX_SEGMENTS = 8
+KEYS = ["SYMBOL", "DATE"]
+
+
+def store_root() -> Path:
+    return Path(os.getenv("MARKETPULSE_FEATURE_STORE") or DEFAULT_ROOT)
+
+
+def open_store(name: str) -> "FeatureStore":
+    """The store `name` under MARKETPULSE_FEATURE_STORE (default <repo>/data/feature_store)."""
+    return FeatureStore(store_root() / name)
+
+
+def _day(d) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(d).date(), "D")
+
+
+def _bound(value):
+    """A meta since/through date as datetime64[D]; None when missing or unparseable."""
+    if not value:
+        return None
+    try:
+        day = _day(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnat(day) else day
+
+
+def _load(path: Path):
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:  # zero-length arrays can't be mapped
+        return np.load(path)
+
+
+class _Segment:
+    def __init__(self, path: Path):
+        index = json.loads((path / "index.json").read_text())
+        self.name = path.name
+        self.symbols = index["symbols"]
+        self.offsets = np.asarray(index["offsets"], dtype=np.int64)
+        self.window = tuple(_day(d) for d in index["window"]) if index["window"] else None
+        self.columns = {c: _load(path / f"{c}.npy") for c in ["DATE", *index["columns"]]}
+        self._pos = {s: i for i, s in enumerate(self.symbols)}
+
+    @property
+    def rows(self) -> int:
+        return int(self.offsets[-1])
+
+    def bounds(self, symbol):
+        i = self._pos.get(symbol)
+        return None if i is None else (int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def column(self, name, lo, hi):
+        col = self.columns.get(name)
+        return col[lo:hi] if col is not None else np.full(hi - lo, np.nan)
+
+
+class FeatureStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = {"segments": [], "columns": [], "since": None, "through": None}
+        self.segments = []
+        for attempt in range(3):
+            try:
+                self._open()
+                break
+            except FileNotFoundError:
+                # a compaction removed a segment between reading meta.json and mapping it
+                if attempt == 2:
+                    raise
+                time.sleep(0.1)
+
+    def _open(self):
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            self.meta = json.loads(meta_path.read_text())
+        self.segments = [_Segment(self.path / name) for name in self.meta["segments"]]
+
+    # ---- reading -------------------------------------------------------------
+
+    @property
+    def columns(self) -> list:
+        return list(self.meta["columns"])
+
+    @property
+    def symbols(self) -> list:
+        return sorted({s for seg in self.segments for s in seg.symbols})
+
+    @property
+    def empty(self) -> bool:
+        return not any(seg.rows for seg in self.segments)
+
+    def covers(self, start, end) -> bool:
+        """True when every row with start <= DATE < end is in the store (start=None: from the beginning)."""
+        through = _bound(self.meta["through"])
+        if through is None:
+            return False
+        if self.meta["since"] == "":
+            starts_ok = True
+        else:
+            since = _bound(self.meta["since"])
+            starts_ok = since is not None and start is not None and since <= _day(start)
+        return starts_ok and _day(end) <= through
+
+    def _visible(self, i, dates):
+        """Mask of rows of segment i not replaced by a later segment's window (None = all visible)."""
+        mask = None
+        for seg in self.segments[i + 1:]:
+            if seg.window is None:
+                continue
+            hidden = (dates >= seg.window[0]) & (dates < seg.window[1])
+            if hidden.any():
+                mask = ~hidden if mask is None else mask & ~hidden
+        return mask
+
+    def arrays(self, symbol, start=None, end=None, columns=None) -> dict:
+        """{"DATE": ..., col: ...} for one symbol and start <= DATE < end.
+
+        Views into the mapped files when a single segment holds the rows; otherwise the
+        pieces are merged and sorted by date.
+        """
+        columns = list(columns or self.columns)
+        parts = []
+        for i, seg in enumerate(self.segments):
+            b = seg.bounds(symbol)
+            if b is None:
+                continue
+            lo, hi = b
+            dates = seg.columns["DATE"][lo:hi]
+            a = int(np.searchsorted(dates, _day(start))) if start is not None else 0
+            z = int(np.searchsorted(dates, _day(end))) if end is not None else len(dates)
+            if a < z:
+                parts.append((seg, lo + a, lo + z, self._visible(i, dates[a:z])))
+
+        if len(parts) == 1 and parts[0][3] is None:
+            seg, lo, hi, _ = parts[0]
+            return {c: seg.column(c, lo, hi) for c in ["DATE", *columns]}
+
+        out = {c: [] for c in ["DATE", *columns]}
+        for seg, lo, hi, mask in parts:
+            for c in out:
+                col = seg.column(c, lo, hi)
+                out[c].append(col if mask is None else col[mask])
+        if not parts:
+            return {c: np.empty(0, dtype="datetime64[D]" if c == "DATE" else np.float64) for c in out}
+        out = {c: np.concatenate(v) for c, v in out.items()}
+        order = np.argsort(out["DATE"], kind="stable")
+        return {c: v[order] for c, v in out.items()}
+
+    def read(self, symbols=None, start=None, end=None, columns=None) -> pd.DataFrame:
+        """Rows with start <= DATE < end as a frame shaped like the warehouse's (DATE as
+        datetime.date, ordered by SYMBOL, DATE). Point-in-time: pass end=as_of."""
+        columns = list(columns or self.columns)
+        wanted = set(symbols) if symbols is not None else None
+        syms, dates, values = [], [], {c: [] for c in columns}
+        for i, seg in enumerate(self.segments):
+            if not seg.rows:
+                continue
+            seg_syms = np.repeat(np.asarray(seg.symbols, dtype=object), np.diff(seg.offsets))
+            d = seg.columns["DATE"]
+            mask = np.ones(seg.rows, dtype=bool)
+            if start is not None:
+                mask &= d >= _day(start)
+            if end is not None:
+                mask &= d < _day(end)
+            if wanted is not None:
+                mask &= np.isin(seg_syms, list(wanted))
+            visible = self._visible(i, d)
+            if visible is not None:
+                mask &= visible
+            syms.append(seg_syms[mask])
+            dates.append(d[mask])
+            for c in columns:
+                values[c].append(seg.column(c, 0, seg.rows)[mask])
+
+        if not syms:
+            return pd.DataFrame(columns=["DATE", "SYMBOL", *columns])
+        df = pd.DataFrame({"DATE": np.concatenate(dates), "SYMBOL": np.concatenate(syms),
+                           **{c: np.concatenate(v) for c, v in values.items()}})
+        if len(syms) > 1:  # a single segment is already in (symbol, date) order
+            df = df.sort_values(["SYMBOL", "DATE"], kind="stable", ignore_index=True)
+        df["DATE"] = pd.to_datetime(df["DATE"]).dt.date
+        return df
+
+    # ---- writing -------------------------------------------------------------
+
+    @contextmanager
+    def _lock(self):
+        import fcntl  # writers run in the Linux Airflow containers
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / ".lock", "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _write_segment(self, df: pd.DataFrame, window) -> str:
+        columns = [c for c in df.columns if c not in KEYS]
+        df = df.assign(DATE=pd.to_datetime(df["DATE"]).to_numpy().astype("datetime64[D]"))
+        df = df.drop_duplicates(KEYS, keep="last").sort_values(KEYS, kind="stable")
+
+        name = f"seg-{dt.datetime.now(dt.timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        tmp = self.path / f".{name}.tmp"
+        tmp.mkdir(parents=True)
+        np.save(tmp / "DATE.npy", df["DATE"].to_numpy().astype("datetime64[D]"))  # pandas widens [D] to [s]
+        for c in columns:
+            np.save(tmp / f"{c}.npy", df[c].astype(np.float64).to_numpy())
+        symbols, first = np.unique(df["SYMBOL"].to_numpy(dtype=str), return_index=True)
+        (tmp / "index.json").write_text(json.dumps({
+            "symbols": symbols.tolist(),
+            "offsets": [*first.tolist(), len(df)],
+            "columns": columns,
+            "window": [str(window[0]), str(window[1])] if window else None,
+        }))
+        os.replace(tmp, self.path / name)
+        return name
+
+    def _commit(self, meta: dict):
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta, indent=2))
+        os.replace(tmp, self.path / "meta.json")
+        live = set(meta["segments"])
+        for p in self.path.iterdir():
+            if p.is_dir() and p.name not in live:
+                shutil.rmtree(p, ignore_errors=True)  # open maps stay valid after unlink
+        self._open()
+
+    def upsert(self, df: pd.DataFrame, start=None, end=None):
+        """Replace the store's rows with start <= DATE < end by `df` (SYMBOL, DATE + numeric columns).
+
+        start=None rewrites the whole store from `df`. Column names are stored as given;
+        pass them upper-case like the warehouse returns them.
+        """
+        with self._lock():
+            self._open()  # another writer may have committed since we opened
+            meta = dict(self.meta)
+            meta["columns"] = list(dict.fromkeys([*meta["columns"], *(c for c in df.columns if c not in KEYS)]))
+            if start is None:
+                meta["segments"] = [self._write_segment(df, None)]
+                if end is None and df.empty:
+                    # nothing to anchor coverage on (e.g. no predictions yet): claim none
+                    meta["since"], meta["through"] = None, None
+                else:
+                    meta["since"] = ""
+                    meta["through"] = str(end or (pd.to_datetime(df["DATE"]).max().date() + dt.timedelta(days=1)))
+            else:
+                meta["segments"] = [*meta["segments"], self._write_segment(df, (start, end))]
+                since, through = meta["since"], _bound(meta["through"])
+                if through is None:
+                    meta["since"], meta["through"] = str(start), str(end)
+                else:
+                    # coverage only grows over windows that touch what is already covered
+                    if _day(start) <= through < _day(end):
+                        meta["through"] = str(end)
+                    since_day = _bound(since)
+                    if since != "" and (since_day is None or _day(start) < since_day <= _day(end)):
+                        meta["since"] = str(start)
+            meta["updated_at"] = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
+            self._commit(meta)
+            if self._needs_compaction():
+                self.compact(locked=True)
+
+    def _needs_compaction(self) -> bool:
+        if len(self.segments) > MAX_SEGMENTS:
+            return True
+        base, tail = self.segments[0].rows, sum(seg.rows for seg in self.segments[1:])
+        return len(self.segments) > 1 and tail > base / 4
+
+    def compact(self, locked=False):
+        """Merge all segments into one base segment."""
+        if not locked:
+            with self._lock():
+                self._open()
+                return self.compact(locked=True)
+        df = self.read()
+        meta = dict(self.meta)
+        meta["segments"] = [self._write_segment(df, None)]
+        meta["compacted_at"] = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
+        self._commit(meta)
@@ -0,0 +1,216 @@
+# marketpulse/instrumentation.py
+"""Lightweight timers/counters for pipeline stages.
+
+A stage opens a RunMetrics; code underneath records into it through the module-level
+timer()/count()/gauge() helpers, so fetch/load/train functions need no extra
+parameters and still work (recording nothing) when called outside a run:
+
+    with RunMetrics("ingest_prices", connect=get_snowflake_connection):
+        with timer("api_request", symbol=sym):
+            ...
+        count("rows_loaded", n, symbol=sym)
+
+On exit the run records its own `stage_duration` and publishes every sample to
+MART.PIPELINE_RUN_METRICS and to an OpenMetrics text file under MARKETPULSE_METRICS_DIR.
+With MARKETPULSE_PROFILE=1 the stage is also profiled (see marketpulse.profiling).
+"""
+import datetime as dt
+import json
+import os
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_METRICS_DIR = Path(__file__).resolve().parents[1] / "metrics"
+METRIC_PREFIX = "marketpulse_"
+
+_active = []  # stack of open RunMetrics; module helpers record into the innermost one
+
+
+class RunMetrics:
+    """Samples for one stage of one pipeline run.
+
+    Each sample is a dict: metric, kind ("timer" seconds | "counter" | "gauge"),
+    value, labels and recorded_at (UTC). `max_samples` bounds memory for
+    long-lived collectors such as the Streamlit app.
+    """
+
+    def __init__(self, stage: str, run_id: str = None, connect=None, max_samples: int = None):
+        self.stage = stage
+        self.run_id = run_id or os.getenv("MARKETPULSE_RUN_ID") or \
+            "manual__" + dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self.connect = connect
+        self.samples = deque(maxlen=max_samples)
+        self._started = None
+        self._profiler = None
+
+    def __enter__(self):
+        from marketpulse import profiling
+
+        if profiling.enabled():
+            self._profiler = profiling.Profiler(self.stage, self.run_id).__enter__()
+        self._started = time.perf_counter()
+        _active.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _active.remove(self)
+        elapsed = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.__exit__(exc_type, exc, tb)
+        # profiled durations are inflated; label them so they can be told apart
+        self.record("stage_duration", "timer", elapsed, status="failed" if exc_type else "ok",
+                    profiled="true" if self._profiler is not None else None)
+        self.publish()
+        return False
+
+    def record(self, metric: str, kind: str, value: float, **labels):
+        self.samples.append({
+            "metric": metric,
+            "kind": kind,
+            "value": float(value),
+            "labels": {k: str(v) for k, v in labels.items() if v is not None},
+            "recorded_at": dt.datetime.now(dt.timezone.utc).replace(tzinfo=None),
+        })
+
+    @contextmanager
+    def timer(self, metric: str, **labels):
+        """Time the block. Yields the labels dict so the block can add e.g. a query id."""
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.record(metric, "timer", time.perf_counter() - started, **labels)
+
+    # ---- export -------------------------------------------------------------
+
+    def to_openmetrics(self) -> str:
+        """Render samples in OpenMetrics text format.
+
+        Timers become summaries (_sum/_count), counters are summed and gauges keep
+        the last value, per metric and label set.
+        """
+        families = {}
+        for s in self.samples:
+            key = tuple(sorted({"stage": self.stage, **s["labels"]}.items()))
+            fam = families.setdefault((s["metric"], s["kind"]), {})
+            if s["kind"] == "timer":
+                total, n = fam.get(key, (0.0, 0))
+                fam[key] = (total + s["value"], n + 1)
+            elif s["kind"] == "counter":
+                fam[key] = fam.get(key, 0.0) + s["value"]
+            else:
+                fam[key] = s["value"]
+
+        lines = []
+        for (metric, kind), series in sorted(families.items()):
+            name = METRIC_PREFIX + _sanitize(metric)
+            if kind == "timer":
+                name += "_seconds"
+                lines += [f"# TYPE {name} summary", f"# UNIT {name} seconds"]
+                for key, (total, n) in series.items():
+                    lines.append(f"{name}_sum{_labels(key)} {total:.6f}")
+                    lines.append(f"{name}_count{_labels(key)} {n}")
+            elif kind == "counter":
+                lines.append(f"# TYPE {name} counter")
+                lines += [f"{name}_total{_labels(key)} {v:g}" for key, v in series.items()]
+            else:
+                lines.append(f"# TYPE {name} gauge")
+                lines += [f"{name}{_labels(key)} {v:g}" for key, v in series.items()]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, directory: Path = None) -> Path:
+        directory = directory or os.getenv("MARKETPULSE_METRICS_DIR") or DEFAULT_METRICS_DIR
+        path = Path(directory) / _sanitize(self.run_id) / f"{self.stage}.prom"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_openmetrics())
+        return path
+
+    def write_to_warehouse(self, conn):
+        cur = conn.cursor()
+        try:
+            cur.executemany("""
+              insert into MART.PIPELINE_RUN_METRICS (run_id, stage, metric, kind, value, labels, recorded_at)
+              select %s, %s, %s, %s, %s, parse_json(%s), %s
+            """, [
+                (self.run_id, self.stage, s["metric"], s["kind"], s["value"],
+                 json.dumps(s["labels"]), s["recorded_at"])
+                for s in self.samples
+            ])
+            conn.commit()
+        finally:
+            cur.close()
+
+    def publish(self):
+        """Best effort: losing metrics must never fail the stage that produced them."""
+        try:
+            path = self.write_openmetrics()
+            print(f"[metrics] {self.stage}: {len(self.samples)} samples -> {path}")
+        except OSError as e:
+            print(f"[metrics] could not write OpenMetrics file: {e}")
+        if self.connect is None:
+            return
+        try:
+            conn = self.connect()
+            try:
+                self.write_to_warehouse(conn)
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"[metrics] could not write MART.PIPELINE_RUN_METRICS: {e}")
+
+
+def current():
+    """The innermost open RunMetrics, or None outside a run."""
+    return _active[-1] if _active else None
+
+
+@contextmanager
+def timer(metric: str, **labels):
+    run = current()
+    if run is None:
+        yield labels
+        return
+    with run.timer(metric, **labels) as lbl:
+        yield lbl
+
+
+@contextmanager
+def load_timer(symbol: str, statements_per_row: int = 1):
+    """Time a per-row load of `symbol`'s rows; the block sets load["rows"] to the rows written.
+
+    Records `warehouse_load` labelled with its statement count (many statements under one
+    timer, so no single query id), then `rows_loaded` and `rows_per_second` once it succeeds.
+    """
+    load = {"rows": 0}
+    started = time.perf_counter()
+    with timer("warehouse_load", symbol=symbol) as labels:
+        yield load
+        labels["statements"] = statements_per_row * load["rows"]
+    count("rows_loaded", load["rows"], symbol=symbol)
+    gauge("rows_per_second", load["rows"] / max(time.perf_counter() - started, 1e-9), symbol=symbol)
+
+
+def count(metric: str, value: float = 1, **labels):
+    run = current()
+    if run is not None:
+        run.record(metric, "counter", value, **labels)
+
+
+def gauge(metric: str, value: float, **labels):
+    run = current()
+    if run is not None:
+        run.record(metric, "gauge", value, **labels)
+
+
+def _sanitize(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _labels(items) -> str:
+    def esc(v):
+        return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{_sanitize(k)}="{esc(v)}"' for k, v in items) + "}"
@@ -0,0 +1,111 @@
+# marketpulse/profiling.py
+"""Opt-in CPU and allocation profiling for a pipeline stage.
+
+Off by default. Turn it on with MARKETPULSE_PROFILE=1 (the Airflow Variable of the same
+name in the DAG) or --profile on the extractor / ML command lines. Every RunMetrics
+stage is then profiled with cProfile and tracemalloc, and three artifacts are written
+to <MARKETPULSE_PROFILE_DIR>/<run_id>/ (default <repo>/profiles, next to the task logs
+in Airflow):
+
+    <stage>.prof          cProfile stats   (snakeviz / python -m pstats)
+    <stage>.alloc         tracemalloc snapshot   (tracemalloc.Snapshot.load)
+    <stage>.summary.txt   top-N functions by cumulative and own time, top-N allocation sites
+
+Code outside a RunMetrics stage (e.g. one Streamlit script run) can use Profiler directly:
+
+    with Profiler("streamlit_app", run_id="app"):
+        ...
+
+Both profilers slow the profiled code down noticeably; compare timings only between
+profiled runs.
+"""
+import cProfile
+import datetime as dt
+import io
+import os
+import pstats
+import re
+import tracemalloc
+from pathlib import Path
+
+DEFAULT_PROFILE_DIR = Path(__file__).resolve().parents[1] / "profiles"
+TOP_N = int(os.getenv("MARKETPULSE_PROFILE_TOP", "25"))
+
+_running = False  # cProfile can't nest; inner Profilers are no-ops
+
+
+def enabled() -> bool:
+    return os.getenv("MARKETPULSE_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def enable():
+    """Switch profiling on for this process (what --profile does)."""
+    os.environ["MARKETPULSE_PROFILE"] = "1"
+
+
+class Profiler:
+    def __init__(self, stage: str, run_id: str = None, directory=None):
+        self.stage = stage
+        self.run_id = run_id or os.getenv("MARKETPULSE_RUN_ID") or \
+            "manual__" + dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self.directory = Path(directory or os.getenv("MARKETPULSE_PROFILE_DIR") or DEFAULT_PROFILE_DIR)
+        self.paths = {}
+        self._profile = None
+        self._owns_tracemalloc = False
+
+    def __enter__(self):
+        global _running
+        if _running:
+            return self
+        _running = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)  # 10 frames so allocation sites show their callers
+            self._owns_tracemalloc = True
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _running
+        if self._profile is None:
+            return False
+        self._profile.disable()
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            # release the process-wide state first, whatever happens while writing
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            _running = False
+        try:
+            self._write(snapshot, peak)
+            print(f"[profile] {self.stage}: {self.paths['summary']}")
+        except OSError as e:  # like metrics, a profiling failure must not fail the stage
+            print(f"[profile] could not write profile for {self.stage}: {e}")
+        return False
+
+    def _write(self, snapshot, peak_bytes):
+        base = self.directory / re.sub(r"[^a-zA-Z0-9_]", "_", self.run_id)
+        base.mkdir(parents=True, exist_ok=True)
+        self.paths = {
+            "prof": base / f"{self.stage}.prof",
+            "alloc": base / f"{self.stage}.alloc",
+            "summary": base / f"{self.stage}.summary.txt",
+        }
+        self._profile.dump_stats(self.paths["prof"])
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        snapshot.dump(str(self.paths["alloc"]))
+
+        out = io.StringIO()
+        out.write(f"stage {self.stage}  run {self.run_id}  peak traced memory {peak_bytes / 2**20:.1f} MB\n")
+        for order in ("cumulative", "tottime"):
+            out.write(f"\n=== top {TOP_N} functions by {order} time ===\n")
+            pstats.Stats(self._profile, stream=out).strip_dirs().sort_stats(order).print_stats(TOP_N)
+        out.write(f"\n=== top {TOP_N} allocation sites (live at stage end) ===\n")
+        for stat in snapshot.statistics("lineno")[:TOP_N]:
+            out.write(f"{stat.size / 2**10:>10.1f} KiB  {stat.count:>8} blocks  {stat.traceback[0]}\n")
+        self.paths["summary"].write_text(out.getvalue())
@@ -0,0 +1,81 @@
+# ml/feature_sync.py
+"""Copy a run window of the mart tables into the local feature store (marketpulse.feature_store).
+
+    python feature_sync.py --start 2025-01-06 --end 2025-01-07             # features
+    python feature_sync.py --start 2025-01-06 --end 2025-01-07 --what predictions
+    python feature_sync.py --what features --full                         # rebuild from the whole table
+
+Training (train_and_infer.load_features) and the dashboard read the store when it covers
+the dates they need and fall back to the warehouse otherwise.
+"""
+import argparse
+import datetime as dt
+import pandas as pd
+from train_and_infer import snow_conn, FEATURES
+from marketpulse.feature_store import open_store
+from marketpulse.instrumentation import RunMetrics, timer, count
+from marketpulse import profiling
+
+# features_daily rewrites the week before each run window (see the dbt model), and the
+# prediction for a window is dated at the last trading day before it
+LOOKBACK_DAYS = 7
+
+QUERIES = {
+    "features": f"""
+      select date, symbol, close, {", ".join(FEATURES)}, label_up_next_day
+      from MART.FEATURES_DAILY
+      where {{bounds}}
+    """,
+    "predictions": """
+      select date, symbol, p_up, pred_label
+      from MART.ML_PREDICTIONS_DAILY
+      where model_version = %(model_version)s and {bounds}
+    """,
+}
+
+
+def store_name(what: str, model_version: str = "v1") -> str:
+    return what if what == "features" else f"{what}_{model_version}"
+
+
+def sync(conn, what: str, start=None, end=None, model_version="v1") -> int:
+    """Replace the store's [start - LOOKBACK_DAYS, end) with the warehouse rows; start=None syncs everything."""
+    params = {"model_version": model_version}
+    if start is None:
+        bounds = "1=1"
+    else:
+        start = start - dt.timedelta(days=LOOKBACK_DAYS)
+        bounds = "date >= %(start)s and date < %(end)s"
+        params.update(start=str(start), end=str(end))
+    with timer("warehouse_query", table=what):
+        df = pd.read_sql(QUERIES[what].format(bounds=bounds), conn, params=params)
+    df.columns = [c.upper() for c in df.columns]
+    with timer("feature_store_write", store=what):
+        open_store(store_name(what, model_version)).upsert(df, start, end)
+    count("rows_synced", len(df), store=what)
+    print(f"synced {len(df)} {what} rows for [{start or 'beginning'}, {end or 'latest'})")
+    return len(df)
+
+
+def run(start=None, end=None, what="features", model_version="v1"):
+    conn = snow_conn()
+    try:
+        with RunMetrics(f"feature_store_sync_{what}", connect=snow_conn):
+            sync(conn, what, start, end, model_version)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync mart tables into the local feature store")
+    parser.add_argument("--start", type=dt.date.fromisoformat, help="first date of the run window (inclusive)")
+    parser.add_argument("--end", type=dt.date.fromisoformat, help="last date of the run window (exclusive)")
+    parser.add_argument("--what", choices=sorted(QUERIES), default="features")
+    parser.add_argument("--full", action="store_true", help="rebuild the store from the whole table")
+    parser.add_argument("--profile", action="store_true", help="write cProfile/tracemalloc artifacts for the run")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+    if not args.full and not (args.start and args.end):
+        parser.error("pass --start and --end, or --full")
+    run(None if args.full else args.start, None if args.full else args.end, what=args.what)
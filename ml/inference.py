@@ -0,0 +1,108 @@
+# ml/inference.py
+"""Score every symbol's logistic regression in one vectorized pass.
+
+StackedModel packs the per-symbol coefficients into W (symbols x features) and the
+intercepts into b, so for feature rows X with symbol indices k
+
+    p_up = sigmoid(sum(X * W[k], axis=1) + b[k])
+
+which is exactly what each model's predict_proba(X)[:, 1] returns, minus the per-symbol
+Python/sklearn overhead. Scoring a whole cross-section (or years of history for a
+backtest) is a couple of NumPy operations.
+"""
+import numpy as np
+import pandas as pd
+
+PRED_THRESHOLD = 0.55
+
+
+def _sigmoid(z):
+    # tanh form is overflow-free for large |z|
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+class StackedModel:
+    def __init__(self, symbols, coef: np.ndarray, intercept: np.ndarray, features):
+        self.symbols = list(symbols)
+        self.coef = np.asarray(coef, dtype=np.float64)            # (S, F)
+        self.intercept = np.asarray(intercept, dtype=np.float64)  # (S,)
+        self.features = list(features)
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+
+    @classmethod
+    def from_models(cls, models: dict, features):
+        """Stack fitted binary LogisticRegression models keyed by symbol."""
+        symbols = sorted(models)
+        n_features = len(features)
+        coef = np.zeros((len(symbols), n_features))
+        intercept = np.zeros(len(symbols))
+        for i, sym in enumerate(symbols):
+            clf = models[sym]
+            if clf.coef_.shape != (1, n_features):
+                raise ValueError(f"{sym}: expected a binary model over {n_features} features, got coef {clf.coef_.shape}")
+            # sklearn sorts classes_, so with 0/1 labels coef_ is the log-odds of P(up)
+            assert list(clf.classes_) == [0, 1], f"{sym}: expected 0/1 labels, got {list(clf.classes_)}"
+            coef[i] = clf.coef_[0]
+            intercept[i] = clf.intercept_[0]
+        return cls(symbols, coef, intercept, features)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _rows(self, symbols) -> np.ndarray:
+        return np.fromiter((self._index.get(s, -1) for s in symbols), dtype=np.int64, count=len(symbols))
+
+    def known(self, symbols) -> np.ndarray:
+        """Boolean mask of the symbols that have a model."""
+        return self._rows(symbols) >= 0
+
+    def predict_proba(self, symbols, X) -> np.ndarray:
+        """P(up) per row; NaN for symbols without a model."""
+        idx = self._rows(symbols)
+        X = np.asarray(X, dtype=np.float64)
+        known = idx >= 0
+        out = np.full(len(idx), np.nan)
+        k = idx[known]
+        z = np.einsum("ij,ij->i", X[known], self.coef[k]) + self.intercept[k]
+        out[known] = _sigmoid(z)
+        return out
+
+    def score_arrays(self, symbol, arrays: dict) -> np.ndarray:
+        """P(up) for one symbol's column arrays, e.g. the memory-mapped views FeatureStore.arrays
+        returns; works column by column, so no feature matrix is built."""
+        k = self._index[symbol]
+        z = np.full(len(arrays["DATE"]), self.intercept[k])
+        for j, c in enumerate(self.features):
+            col = arrays[c.upper()]
+            z += self.coef[k, j] * np.where(np.isnan(col), 0.0, col)
+        return _sigmoid(z)
+
+    def score_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """DATE, SYMBOL, P_UP, PRED_LABEL for the rows of a FEATURES_DAILY frame that have a model."""
+        X = df[[c.upper() for c in self.features]].fillna(0.0).to_numpy(dtype=np.float64)
+        proba = self.predict_proba(df["SYMBOL"].to_numpy(), X)
+        keep = ~np.isnan(proba)
+        return pd.DataFrame({
+            "DATE": df["DATE"].to_numpy()[keep],
+            "SYMBOL": df["SYMBOL"].to_numpy()[keep],
+            "P_UP": proba[keep],
+            "PRED_LABEL": (proba[keep] >= PRED_THRESHOLD).astype(int),
+        })
+
+
+def score_history(df_feats: pd.DataFrame, model: StackedModel, start=None, end=None) -> pd.DataFrame:
+    """Re-score every (symbol, date) in [start, end) with today's models, e.g. for a backtest.
+
+    Keeps LABEL_UP_NEXT_DAY alongside the score when the frame has it.
+    """
+    mask = np.ones(len(df_feats), dtype=bool)
+    if start is not None:
+        mask &= (df_feats["DATE"] >= start).to_numpy()
+    if end is not None:
+        mask &= (df_feats["DATE"] < end).to_numpy()
+    rows = df_feats[mask]
+    scored = model.score_frame(rows)
+    if "LABEL_UP_NEXT_DAY" in rows.columns:
+        labels = rows.loc[model.known(rows["SYMBOL"]), "LABEL_UP_NEXT_DAY"].to_numpy()
+        scored["LABEL_UP_NEXT_DAY"] = labels
+    return scored
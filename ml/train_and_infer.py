@@ -1,11 +1,15 @@
 # replace the whole file with this version
 
 import os
+import argparse
+import datetime as dt
 import pandas as pd
 from dotenv import load_dotenv
 from snowflake import connector
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import roc_auc_score, accuracy_score
+from marketpulse.instrumentation import RunMetrics, timer, count, gauge
+from inference import StackedModel, PRED_THRESHOLD, score_history
+from marketpulse.feature_store import open_store
+from marketpulse import profiling
 
 load_dotenv()
 
@@ -17,31 +21,105 @@ def snow_conn():
         warehouse=os.getenv("SNOWFLAKE_WAREHOUSE"),
         database=os.getenv("SNOWFLAKE_DATABASE"),
         schema="MART",
+        # each delete + insert replace below commits as one transaction, as in db_utils
+        autocommit=False,
     )
 
-FEATURES = ["ret_d1","ret_5d","vol_20d","articles_1d","articles_3d","surprise_pct"]
-
-def load_features(conn, lookback_days=365*2):
+FEATURES = ["ret_d1","ret_5d","vol_20d","articles_1d","articles_3d","sentiment_1d","sentiment_3d","surprise_pct"]
+
+def _features_from_store(as_of, lookback_days):
+    """Same rows as the warehouse query below, from the local feature store; None if it can't answer."""
+    store = open_store("features")
+    # read a week extra so the window can anchor on the last date before as_of
+    lo = as_of - dt.timedelta(days=lookback_days + 7)
+    if not store.covers(lo, as_of):
+        return None
+    with timer("feature_store_read", store="features"):
+        df = store.read(start=lo, end=as_of, columns=[c.upper() for c in FEATURES] + ["LABEL_UP_NEXT_DAY"])
+    if df.empty or df["DATE"].max() - dt.timedelta(days=lookback_days) < lo:
+        return None
+    return df[df["DATE"] >= df["DATE"].max() - dt.timedelta(days=lookback_days)].reset_index(drop=True)
+
+def load_features(conn, as_of=None, lookback_days=365*2):
+    # as_of is exclusive: a backfill run only ever sees features up to its own data interval
+    if as_of:
+        df = _features_from_store(as_of, lookback_days)
+        if df is not None:
+            count("rows_read", len(df), table="FEATURES_DAILY", source="feature_store")
+            return df
+    bound = "date < %(as_of)s" if as_of else "1=1"
     q = f"""
       select date, symbol,
              {", ".join(FEATURES)},
              label_up_next_day
       from MART.FEATURES_DAILY
-      where date >= dateadd('day', -{lookback_days}, (select max(date) from MART.FEATURES_DAILY))
+      where {bound}
+        and date >= dateadd('day', -{lookback_days}, (select max(date) from MART.FEATURES_DAILY where {bound}))
+      order by symbol, date
+    """
+    with timer("warehouse_query", table="FEATURES_DAILY"):
+        df = pd.read_sql(q, conn, params={"as_of": str(as_of)} if as_of else None)
+    count("rows_read", len(df), table="FEATURES_DAILY", source="warehouse")
+    return df
+
+def _backtest_from_store(stacked, start, end):
+    """score_history's frame for [start, end) straight from the store's mapped columns; None if it can't answer."""
+    store = open_store("features")
+    if not store.covers(start, end):
+        return None
+    columns = [c.upper() for c in FEATURES] + ["LABEL_UP_NEXT_DAY"]
+    parts = []
+    with timer("feature_store_read", store="features"):
+        for sym in stacked.symbols:
+            arrays = store.arrays(sym, start, end, columns=columns)
+            if not len(arrays["DATE"]):
+                continue
+            p_up = stacked.score_arrays(sym, arrays)
+            parts.append(pd.DataFrame({
+                "DATE": arrays["DATE"], "SYMBOL": sym, "P_UP": p_up,
+                "PRED_LABEL": (p_up >= PRED_THRESHOLD).astype(int),
+                "LABEL_UP_NEXT_DAY": arrays["LABEL_UP_NEXT_DAY"],
+            }))
+    if not parts:
+        return pd.DataFrame(columns=["DATE", "SYMBOL", "P_UP", "PRED_LABEL", "LABEL_UP_NEXT_DAY"])
+    df = pd.concat(parts, ignore_index=True)
+    df["DATE"] = pd.to_datetime(df["DATE"]).dt.date
+    return df
+
+def backtest(conn, stacked: StackedModel, start, end):
+    """Re-score every (symbol, date) in [start, end) with `stacked`, next to the realized label.
+
+    Reads the local feature store when it covers the window, else MART.FEATURES_DAILY.
+    """
+    df = _backtest_from_store(stacked, start, end)
+    if df is not None:
+        count("rows_read", len(df), table="FEATURES_DAILY", source="feature_store")
+        return df
+    q = f"""
+      select date, symbol, {", ".join(FEATURES)}, label_up_next_day
+      from MART.FEATURES_DAILY
+      where date >= %(start)s and date < %(end)s
       order by symbol, date
     """
-    return pd.read_sql(q, conn)
+    with timer("warehouse_query", table="FEATURES_DAILY"):
+        df = pd.read_sql(q, conn, params={"start": str(start), "end": str(end)})
+    df.columns = [c.upper() for c in df.columns]
+    count("rows_read", len(df), table="FEATURES_DAILY", source="warehouse")
+    return score_history(df, stacked)
 
 def _both_classes(y):
     s = pd.Series(y)
     return s.nunique() >= 2
 
 def _fit_logreg(X, y):
+    # sklearn is imported lazily so the in-process Airflow task only pays for it when training
+    from sklearn.linear_model import LogisticRegression
     clf = LogisticRegression(max_iter=500, class_weight="balanced")
     clf.fit(X, y)
     return clf
 
 def train_per_symbol(df: pd.DataFrame, min_rows=12):
+    from sklearn.metrics import roc_auc_score, accuracy_score
     models, metrics = {}, {}
     for sym, g in df.groupby("SYMBOL"):
         g = g.dropna(subset=["LABEL_UP_NEXT_DAY"]).copy()
@@ -55,75 +133,106 @@ def train_per_symbol(df: pd.DataFrame, min_rows=12):
             # cannot train a classifier with one class in entire history
             continue
 
-        # try to find a time-based split (60–90%) that has both classes in train
-        cut = None
-        for frac in [0.9, 0.85, 0.8, 0.75, 0.7, 0.65, 0.6]:
-            c = max(1, int(len(g) * frac))
-            if _both_classes(y_all.iloc[:c]):
-                cut = c
-                break
-
-        if cut is None:
-            # if we never found a split, fit on all data (ok for a daily batch demo)
-            clf = _fit_logreg(X_all, y_all)
-            auc = acc = None
-        else:
-            X_tr, X_te = X_all.iloc[:cut], X_all.iloc[cut:]
-            y_tr, y_te = y_all.iloc[:cut], y_all.iloc[cut:]
-            clf = _fit_logreg(X_tr, y_tr)
-            if len(X_te) and _both_classes(y_te):
-                proba = clf.predict_proba(X_te)[:, 1]
-                auc = float(roc_auc_score(y_te, proba))
-                acc = float(accuracy_score(y_te, (pd.Series(proba) >= 0.55).astype(int)))
-            else:
+        # timed only once the symbol is known to get a model, so skips don't show up as training
+        with timer("train_symbol", symbol=sym):
+            # try to find a time-based split (60–90%) that has both classes in train
+            cut = None
+            for frac in [0.9, 0.85, 0.8, 0.75, 0.7, 0.65, 0.6]:
+                c = max(1, int(len(g) * frac))
+                if _both_classes(y_all.iloc[:c]):
+                    cut = c
+                    break
+
+            if cut is None:
+                # if we never found a split, fit on all data (ok for a daily batch demo)
+                clf = _fit_logreg(X_all, y_all)
                 auc = acc = None
+            else:
+                X_tr, X_te = X_all.iloc[:cut], X_all.iloc[cut:]
+                y_tr, y_te = y_all.iloc[:cut], y_all.iloc[cut:]
+                clf = _fit_logreg(X_tr, y_tr)
+                if len(X_te) and _both_classes(y_te):
+                    proba = clf.predict_proba(X_te)[:, 1]
+                    auc = float(roc_auc_score(y_te, proba))
+                    acc = float(accuracy_score(y_te, (pd.Series(proba) >= PRED_THRESHOLD).astype(int)))
+                else:
+                    auc = acc = None
 
         models[sym] = clf
         metrics[sym] = {"auc": auc, "acc": acc, "n": len(g)}
     return models, metrics
 
-def write_metrics(conn, metrics, model_version="v1"):
+def write_metrics(conn, metrics, as_of_date, model_version="v1"):
     cur = conn.cursor()
     try:
+        # re-running a date replaces its metrics instead of stacking duplicates
+        cur.execute("""
+          delete from MART.ML_MODEL_METRICS where as_of_date = %s and model_version = %s
+        """, (as_of_date, model_version))
         for sym, m in metrics.items():
             cur.execute("""
-              insert into MART.ML_MODEL_METRICS (symbol, auc, accuracy, n_rows, model_version)
-              select %s, %s, %s, %s, %s
-            """, (sym, m.get("auc"), m.get("acc"), m.get("n"), model_version))
+              insert into MART.ML_MODEL_METRICS (as_of_date, symbol, auc, accuracy, n_rows, model_version)
+              select %s, %s, %s, %s, %s, %s
+            """, (as_of_date, sym, m.get("auc"), m.get("acc"), m.get("n"), model_version))
         conn.commit()
-        print(f"logged {len(metrics)} model metrics")
+        print(f"logged {len(metrics)} model metrics for {as_of_date}")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         cur.close()
 
 def write_predictions(conn, df_feats, per_sym_models, model_version="v1"):
+    """Score the latest date's cross-section with all per-symbol models at once and replace its rows."""
     cur = conn.cursor()
     try:
         latest_date = df_feats["DATE"].max()
-        today = df_feats[df_feats["DATE"] == latest_date].copy()
-        rows = 0
-        for sym, g in today.groupby("SYMBOL"):
-            clf = per_sym_models.get(sym)
-            if clf is None:
-                continue
-            X = g[[c.upper() for c in FEATURES]].fillna(0.0)
-            proba = clf.predict_proba(X)[:, 1]
-            pred = (proba >= 0.55).astype(int)
-            for p_up, lbl in zip(proba, pred):
-                cur.execute("""
-                  insert into MART.ML_PREDICTIONS_DAILY (date, symbol, p_up, pred_label, model_version)
-                  select %s, %s, %s, %s, %s
-                """, (latest_date, sym, float(p_up), int(lbl), model_version))
-                rows += 1
+        today = df_feats[df_feats["DATE"] == latest_date]
+        with timer("score_cross_section"):
+            scored = StackedModel.from_models(per_sym_models, FEATURES).score_frame(today)
+        cur.execute("""
+          delete from MART.ML_PREDICTIONS_DAILY where date = %s and model_version = %s
+        """, (latest_date, model_version))
+        # VALUES (not SELECT) so the connector can send the batch as one multi-row insert
+        cur.executemany("""
+          insert into MART.ML_PREDICTIONS_DAILY (date, symbol, p_up, pred_label, model_version)
+          values (%s, %s, %s, %s, %s)
+        """, [(latest_date, sym, float(p), int(lbl), model_version)
+              for sym, p, lbl in zip(scored["SYMBOL"], scored["P_UP"], scored["PRED_LABEL"])])
         conn.commit()
-        print(f"wrote {rows} predictions for {latest_date}")
+        count("predictions_written", len(scored))
+        print(f"wrote {len(scored)} predictions for {latest_date}")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         cur.close()
 
-if __name__ == "__main__":
+def run(as_of=None, model_version="v1"):
     conn = snow_conn()
-    feats = load_features(conn)
-    per_models, per_metrics = train_per_symbol(feats, min_rows=12)
-    print("Per-symbol models trained:", len(per_models), "| sample metrics:", dict(list(per_metrics.items())[:3]))
-    write_metrics(conn, per_metrics, model_version="v1")
-    write_predictions(conn, feats, per_models, model_version="v1")
-    conn.close()
+    try:
+        with RunMetrics("ml_train_and_predict", connect=snow_conn):
+            feats = load_features(conn, as_of=as_of)
+            if feats.empty:
+                print(f"no features before {as_of}; nothing to train")
+                return
+            with timer("train_all"):
+                per_models, per_metrics = train_per_symbol(feats, min_rows=12)
+            gauge("models_trained", len(per_models))
+            print("Per-symbol models trained:", len(per_models), "| sample metrics:", dict(list(per_metrics.items())[:3]))
+            with timer("write_metrics"):
+                write_metrics(conn, per_metrics, feats["DATE"].max(), model_version=model_version)
+            with timer("write_predictions"):
+                write_predictions(conn, feats, per_models, model_version=model_version)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train per-symbol models and write predictions")
+    parser.add_argument("--as-of", type=dt.date.fromisoformat,
+                        help="exclusive upper bound on feature dates (the run's data interval end)")
+    parser.add_argument("--profile", action="store_true", help="write cProfile/tracemalloc artifacts for the run")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+    run(as_of=args.as_of)
@@ -2,9 +2,14 @@ import os
 import pandas as pd
 from dotenv import load_dotenv
 import snowflake.connector
+from marketpulse.instrumentation import RunMetrics
 
 load_dotenv()
 
+# long-lived collector for query latency; the Pipeline Performance tab reads it.
+# Bounded so a dashboard left open for weeks doesn't grow without limit.
+APP_METRICS = RunMetrics("streamlit_app", run_id="app", max_samples=2000)
+
 def get_conn():
     return snowflake.connector.connect(
         user=os.getenv("SNOWFLAKE_USER"),
@@ -17,13 +22,17 @@ def get_conn():
         client_session_keep_alive=True,
     )
 
-def fetch_df(sql: str, params: dict | None = None) -> pd.DataFrame:
-    conn = get_conn()
+def fetch_df(sql: str, params: dict | None = None, name: str = "adhoc") -> pd.DataFrame:
+    with APP_METRICS.timer("connect", loader=name):
+        conn = get_conn()
     cur = conn.cursor()
     try:
-        cur.execute(sql, params or {})
-        cols = [c[0] for c in cur.description]
-        rows = cur.fetchall()
+        with APP_METRICS.timer("query", loader=name) as q:
+            cur.execute(sql, params or {})
+            cols = [c[0] for c in cur.description]
+            rows = cur.fetchall()
+            q["query_id"] = cur.sfqid
+            q["rows"] = len(rows)
         df = pd.DataFrame(rows, columns=cols)
         return df
     finally:
@@ -0,0 +1,140 @@
+# stock-app/loaders.py
+"""Warehouse queries behind the dashboard, kept free of Streamlit so they can be
+benchmarked / reused outside the app. app.py wraps each one in st.cache_data."""
+import datetime as dt
+import json
+import pandas as pd
+from db import fetch_df, APP_METRICS
+from marketpulse.feature_store import open_store
+
+# the pipeline's model version; its predictions are mirrored in the local store
+MODEL_VERSION = "v1"
+
+def load_latest_predictions():
+    sql = """
+      select date, symbol, p_up, pred_label, auc, accuracy, n_rows, model_version
+      from MART.VW_PREDICTIONS_WITH_QC
+      order by symbol
+    """
+    df = fetch_df(sql, name="latest_predictions")
+    if not df.empty:
+        df["DATE"] = pd.to_datetime(df["DATE"])
+        df["P_UP"] = df["P_UP"].astype(float)
+        # tidy
+        for col in ["AUC", "ACCURACY"]:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+def load_history(symbol, days=180):
+    # local prediction store first (synced by the DAG right after training), warehouse otherwise
+    start = dt.date.today() - dt.timedelta(days=int(days))
+    store = open_store(f"predictions_{MODEL_VERSION}")
+    if store.covers(start, dt.date.today() - dt.timedelta(days=1)):
+        with APP_METRICS.timer("feature_store_read", loader="history") as q:
+            df = store.read(symbols=[symbol], start=start)
+            q["rows"] = len(df)
+        df["DATE"] = pd.to_datetime(df["DATE"])
+        df["PRED_LABEL"] = df["PRED_LABEL"].astype(int)
+        df["MODEL_VERSION"] = MODEL_VERSION
+        return df[["DATE", "SYMBOL", "P_UP", "PRED_LABEL", "MODEL_VERSION"]]
+    sql = f"""
+      select date, symbol, p_up, pred_label, model_version
+      from MART.ML_PREDICTIONS_DAILY
+      where symbol = %(sym)s
+        and date >= dateadd('day', -{int(days)}, current_date())
+      order by date
+    """
+    df = fetch_df(sql, {"sym": symbol}, name="history")
+    if not df.empty:
+        df["DATE"] = pd.to_datetime(df["DATE"])
+        df["P_UP"] = df["P_UP"].astype(float)
+    return df
+
+def load_metrics(symbol=None, limit_rows=300):
+    where = "where 1=1"
+    params = {}
+    if symbol:
+        where += " and symbol = %(sym)s"
+        params["sym"] = symbol
+    sql = f"""
+      select as_of_date, trained_at, symbol, auc, accuracy, n_rows, model_version
+      from MART.ML_MODEL_METRICS
+      {where}
+      -- backfills train many dates within minutes, so history is ordered by as_of_date
+      order by as_of_date desc nulls last, trained_at desc
+      limit {int(limit_rows)}
+    """
+    df = fetch_df(sql, params, name="metrics")
+    if not df.empty:
+        df["AS_OF_DATE"] = pd.to_datetime(df["AS_OF_DATE"])
+        df["TRAINED_AT"] = pd.to_datetime(df["TRAINED_AT"])
+        for c in ["AUC", "ACCURACY"]:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df
+
+def load_news(symbol=None, days=60):
+    # Optional table: MART.FCT_NEWS (headlines, published_at, url, symbol)
+    where, params = "where published_at >= dateadd('day', -%(d)s, current_date())", {"d": days}
+    if symbol:
+        where += " and symbol = %(sym)s"
+        params["sym"] = symbol
+    sql = f"""
+      select published_at, symbol, source, headline, url
+      from MART.FCT_NEWS
+      {where}
+      order by published_at desc
+      limit 200
+    """
+    try:
+        df = fetch_df(sql, params, name="news")
+        if not df.empty:
+            df["PUBLISHED_AT"] = pd.to_datetime(df["PUBLISHED_AT"])
+        return df
+    except Exception:
+        return pd.DataFrame()
+
+def load_earnings(symbol=None, lookback_quarters=8):
+    # Optional table: MART.FCT_EARNINGS (symbol, report_date, surprise_pct, eps_actual, eps_estimate)
+    where, params = "where 1=1", {}
+    if symbol:
+        where += " and symbol = %(sym)s"
+        params["sym"] = symbol
+    sql = f"""
+      select report_date, symbol, surprise_pct, eps_actual, eps_estimate
+      from MART.FCT_EARNINGS
+      {where}
+      order by report_date desc
+      limit {int(lookback_quarters * 20)}
+    """
+    try:
+        df = fetch_df(sql, params, name="earnings")
+        if not df.empty:
+            df["REPORT_DATE"] = pd.to_datetime(df["REPORT_DATE"])
+            for c in ["SURPRISE_PCT","EPS_ACTUAL","EPS_ESTIMATE"]:
+                if c in df.columns:
+                    df[c] = pd.to_numeric(df[c], errors="coerce")
+        return df
+    except Exception:
+        return pd.DataFrame()
+
+def load_pipeline_metrics(days=30):
+    # Written by marketpulse.instrumentation from the ingest / ML tasks (one row per sample)
+    sql = f"""
+      select run_id, stage, metric, kind, value, labels, recorded_at
+      from MART.PIPELINE_RUN_METRICS
+      where recorded_at >= dateadd('day', -{int(days)}, current_timestamp())
+      order by recorded_at
+    """
+    try:
+        df = fetch_df(sql, name="pipeline_metrics")
+        if not df.empty:
+            df["RECORDED_AT"] = pd.to_datetime(df["RECORDED_AT"])
+            df["VALUE"] = pd.to_numeric(df["VALUE"], errors="coerce")
+            labels = df["LABELS"].apply(lambda s: json.loads(s) if s else {})
+            df["SYMBOL"] = labels.apply(lambda d: d.get("symbol"))
+            df["QUERY_ID"] = labels.apply(lambda d: d.get("query_id"))
+            df["STATEMENTS"] = pd.to_numeric(labels.apply(lambda d: d.get("statements", 1)), errors="coerce")
+        return df
+    except Exception:
+        return pd.DataFrame()
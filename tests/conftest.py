@@ -0,0 +1,10 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# the shared marketpulse package is imported with the repo root on the path, as in the containers;
+# the ml modules import each other by bare name from their own directory
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "ml"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
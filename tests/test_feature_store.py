@@ -0,0 +1,125 @@
+# tests/test_feature_store.py
+import datetime as dt
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from marketpulse import feature_store
+from marketpulse.feature_store import FeatureStore
+
+D0 = dt.date(2025, 1, 1)
+
+
+def day(i):
+    return D0 + dt.timedelta(days=i)
+
+
+def frame(symbols, days, value=0.0):
+    rows = [(s, day(i), float(i) + value) for s in symbols for i in days]
+    return pd.DataFrame(rows, columns=["SYMBOL", "DATE", "X"])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeatureStore(tmp_path / "features")
+
+
+def test_full_sync_round_trip(store):
+    df = frame(["B", "A"], range(10))
+    store.upsert(df)
+    out = store.read()
+    assert list(out.columns) == ["DATE", "SYMBOL", "X"]
+    assert out["SYMBOL"].tolist() == ["A"] * 10 + ["B"] * 10
+    assert out["DATE"].tolist()[:3] == [day(0), day(1), day(2)]
+    assert store.covers(None, day(10))
+    assert not store.covers(None, day(11))
+
+
+def test_point_in_time_read_excludes_as_of(store):
+    store.upsert(frame(["A"], range(10)))
+    out = store.read(end=day(5))
+    assert out["DATE"].max() == day(4)
+    assert store.read(start=day(3), end=day(5))["DATE"].tolist() == [day(3), day(4)]
+
+
+def test_single_segment_arrays_are_views_into_the_map(store):
+    store.upsert(frame(["A", "B"], range(10)))
+    arrays = store.arrays("B", start=day(2), end=day(6))
+    assert isinstance(arrays["X"], np.memmap)
+    assert arrays["X"].tolist() == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_window_upsert_replaces_and_deletes_rows(store):
+    store.upsert(frame(["A", "B"], range(10)))
+    # rewrite [5, 8): A gets new values, B has no rows in the window any more
+    store.upsert(frame(["A"], range(5, 8), value=100.0), day(5), day(8))
+
+    a = store.read(symbols=["A"])
+    assert a["X"].tolist() == [0, 1, 2, 3, 4, 105, 106, 107, 8, 9]
+    b = store.read(symbols=["B"])
+    assert b["DATE"].tolist() == [day(i) for i in (0, 1, 2, 3, 4, 8, 9)]
+    assert store.arrays("A")["X"].tolist() == a["X"].tolist()
+    assert store.arrays("B")["DATE"].tolist() == b["DATE"].tolist()
+
+
+def test_compaction_keeps_visible_rows(store, monkeypatch):
+    monkeypatch.setattr(feature_store, "MAX_SEGMENTS", 2)
+    base = frame(["A", "B"], range(40))
+    store.upsert(base)
+    expected = base.set_index(["SYMBOL", "DATE"])["X"].copy()
+    for k, start in enumerate((10, 20, 30)):
+        window = frame(["A", "B"], range(start, start + 2), value=1000.0 * (k + 1))
+        store.upsert(window, day(start), day(start + 2))
+        expected.update(window.set_index(["SYMBOL", "DATE"])["X"])
+
+    assert len(store.segments) <= 2
+    out = store.read().set_index(["SYMBOL", "DATE"])["X"]
+    pd.testing.assert_series_equal(out, expected.sort_index(), check_names=False)
+    # old segment directories are removed once meta.json stops naming them
+    live = {p.name for p in store.path.iterdir() if p.is_dir()}
+    assert live == set(store.meta["segments"])
+
+
+def test_coverage_grows_only_over_contiguous_windows(store):
+    store.upsert(frame(["A"], range(5)), day(0), day(5))
+    assert store.covers(day(0), day(5))
+    assert not store.covers(None, day(5))  # incremental syncs never claim "from the beginning"
+
+    store.upsert(frame(["A"], range(3, 7)), day(3), day(7))
+    assert store.covers(day(0), day(7))
+
+    store.upsert(frame(["A"], range(10, 12)), day(10), day(12))  # gap [7, 10)
+    assert not store.covers(day(0), day(12))
+    assert store.covers(day(1), day(7))
+
+
+def test_reopened_store_sees_other_writers(store):
+    store.upsert(frame(["A"], range(5)))
+    FeatureStore(store.path).upsert(frame(["A"], range(5, 8)), day(5), day(8))
+    assert FeatureStore(store.path).read()["DATE"].max() == day(7)
+
+
+def test_empty_full_sync_claims_no_coverage(store):
+    store.upsert(frame([], []))
+    assert store.meta["through"] is None
+    assert not store.covers(day(0), day(1))
+    assert store.read().empty
+
+    # the nightly windowed sync still works afterwards
+    store.upsert(frame(["A"], range(2)), day(0), day(2))
+    assert store.covers(day(0), day(2))
+    assert store.read()["DATE"].tolist() == [day(0), day(1)]
+
+
+def test_unparseable_bounds_mean_not_covered(store):
+    store.upsert(frame(["A"], range(3)))
+    meta = json.loads((store.path / "meta.json").read_text())
+    meta["through"] = "NaT"
+    (store.path / "meta.json").write_text(json.dumps(meta))
+
+    broken = FeatureStore(store.path)
+    assert not broken.covers(day(0), day(1))
+    broken.upsert(frame(["A"], range(3, 5)), day(3), day(5))
+    assert broken.covers(day(3), day(5))
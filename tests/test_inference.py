@@ -0,0 +1,87 @@
+# tests/test_inference.py
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.linear_model import LogisticRegression
+
+from inference import StackedModel, score_history
+
+FEATURES = ["f1", "f2", "f3"]
+
+
+def fitted(seed, n=80):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, len(FEATURES)))
+    y = (X @ rng.normal(size=len(FEATURES)) + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    return LogisticRegression(max_iter=500, class_weight="balanced").fit(X, y), X
+
+
+@pytest.fixture
+def models():
+    return {sym: fitted(seed) for seed, sym in enumerate(["MSFT", "AAPL", "GOOGL"])}
+
+
+def test_predict_proba_matches_each_model(models):
+    stacked = StackedModel.from_models({s: clf for s, (clf, _) in models.items()}, FEATURES)
+    for sym, (clf, X) in models.items():
+        got = stacked.predict_proba([sym] * len(X), X)
+        np.testing.assert_allclose(got, clf.predict_proba(X)[:, 1], rtol=1e-12, atol=1e-12)
+
+
+def test_unknown_symbols_get_nan(models):
+    stacked = StackedModel.from_models({s: clf for s, (clf, _) in models.items()}, FEATURES)
+    X = np.zeros((2, len(FEATURES)))
+    got = stacked.predict_proba(["AAPL", "TSLA"], X)
+    assert not np.isnan(got[0]) and np.isnan(got[1])
+    assert stacked.known(["AAPL", "TSLA"]).tolist() == [True, False]
+
+
+def test_non_binary_labels_are_rejected():
+    X = np.random.default_rng(0).normal(size=(20, len(FEATURES)))
+    clf = LogisticRegression().fit(X, np.where(X[:, 0] > 0, "up", "dn"))
+    with pytest.raises(AssertionError):
+        StackedModel.from_models({"AAPL": clf}, FEATURES)
+
+
+def test_score_history_keeps_labels_of_scored_rows(models):
+    stacked = StackedModel.from_models({s: clf for s, (clf, _) in models.items()}, FEATURES)
+    rows = []
+    for sym in ["AAPL", "TSLA", "MSFT"]:
+        for day in range(3):
+            rows.append({"DATE": day, "SYMBOL": sym, "F1": 0.1 * day, "F2": -0.2, "F3": 0.3,
+                         "LABEL_UP_NEXT_DAY": (day + len(sym)) % 2})
+    df = pd.DataFrame(rows)
+    scored = score_history(df, stacked, start=1)
+    expected = df[(df["DATE"] >= 1) & (df["SYMBOL"] != "TSLA")]
+    assert scored["SYMBOL"].tolist() == expected["SYMBOL"].tolist()
+    assert scored["LABEL_UP_NEXT_DAY"].tolist() == expected["LABEL_UP_NEXT_DAY"].tolist()
+
+
+def test_backtest_reads_the_store_columns(models, tmp_path, monkeypatch):
+    pytest.importorskip("snowflake.connector")
+    import train_and_infer
+    from marketpulse.feature_store import open_store
+
+    monkeypatch.setenv("MARKETPULSE_FEATURE_STORE", str(tmp_path))
+    monkeypatch.setattr(train_and_infer, "FEATURES", FEATURES)
+    stacked = StackedModel.from_models({s: clf for s, (clf, _) in models.items()}, FEATURES)
+    d0 = dt.date(2025, 1, 1)
+    rows = []
+    for sym, (_, X) in [("TSLA", models["AAPL"]), *models.items()]:
+        for i, x in enumerate(X[:20]):
+            rows.append({"SYMBOL": sym, "DATE": d0 + dt.timedelta(days=i),
+                         "F1": x[0], "F2": np.nan if i == 3 else x[1], "F3": x[2], "LABEL_UP_NEXT_DAY": float(i % 2)})
+    df = pd.DataFrame(rows)
+    open_store("features").upsert(df)
+
+    start, end = d0 + dt.timedelta(days=5), d0 + dt.timedelta(days=15)
+    got = train_and_infer.backtest(None, stacked, start, end)  # the store covers it: no warehouse
+    expected = score_history(open_store("features").read(start=start, end=end), stacked)
+    assert got["SYMBOL"].tolist() == expected["SYMBOL"].tolist()
+    assert got["DATE"].tolist() == expected["DATE"].tolist()
+    np.testing.assert_allclose(got["P_UP"], expected["P_UP"], rtol=1e-12)
+    assert got["LABEL_UP_NEXT_DAY"].tolist() == expected["LABEL_UP_NEXT_DAY"].tolist()